@@ -4,6 +4,8 @@ Stanzle Game Main Entry Point
 Simple entry point for the restructured application
 """
 
+import calendar
+import json
 import os
 import re
 import sys
@@ -11,7 +13,7 @@ import secrets
 import requests
 from urllib.parse import urlencode, urlparse
 from datetime import datetime, timedelta, timezone
-from flask import Flask, request, jsonify, redirect, send_from_directory, make_response
+from flask import Flask, request, jsonify, redirect, make_response
 from flask_cors import CORS
 from dotenv import load_dotenv
 from functools import wraps
@@ -88,6 +90,10 @@ from src.backend.services.openai_service import OpenAIService
 from src.backend.services.auth_service import AuthService
 from src.backend.services.challenge_tracker import ChallengeTracker
 from src.backend.utils.validators import validate_poem_data
+from src.backend.utils.pagination import clamp_page_size, decode_cursor, encode_cursor
+from src.backend.utils.http_cache import make_etag, matching_etag
+from src.backend.utils.compression import init_compression
+from src.backend.utils.static_assets import StaticAssets
 
 # Initialize Flask app (static_folder=None avoids duplicate /<path> rule; we serve public/ in static_or_spa)
 app = Flask(__name__, static_folder=None, template_folder=_PUBLIC_DIR)
@@ -114,6 +120,9 @@ CORS(
     allow_headers=["Content-Type", "Authorization", "X-Stanzle-Calendar-Date"],
 )
 
+# gzip/brotli for JSON bodies over COMPRESS_MIN_SIZE; static files use build-time .gz/.br siblings
+init_compression(app)
+
 _CAL_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 
 
@@ -151,12 +160,64 @@ def _leaderboard_calendar_date() -> str:
         return q
     return _calendar_date_from_request()
 
+
+def _page_request():
+    """
+    (limit, position) when the caller asked for a page via ?limit= and/or ?cursor=,
+    else None so the endpoint keeps its full legacy response. Raises ValueError on a bad cursor.
+    """
+    if "limit" not in request.args and "cursor" not in request.args:
+        return None
+    limit = clamp_page_size(request.args.get("limit", type=int))
+    return limit, decode_cursor(request.args.get("cursor"))
+
+def _json_body(body):
+    """jsonify a payload, or wrap already-serialized JSON bytes as-is."""
+    if isinstance(body, bytes):
+        return app.response_class(body, mimetype="application/json")
+    return jsonify(body)
+
+def _conditional_json(build, *version, vary=None):
+    """
+    build() (a dict, or pre-serialized JSON bytes) with a strong ETag from `version`; a matching
+    If-None-Match gets a 304 before build() runs. Responses whose version is unknown (any part None)
+    are not tagged.
+    """
+    if any(part is None for part in version):
+        response = _json_body(build())
+    else:
+        etag = make_etag(request.path, *version)
+        matched = matching_etag(request.if_none_match, etag)
+        if matched is not None:
+            # Echo the variant the client holds (e.g. "<etag>-gz" from a compressed 200)
+            response = make_response("", 304)
+            response.set_etag(matched)
+        else:
+            response = _json_body(build())
+            response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+    if vary:
+        response.vary.add(vary)
+    return response
+
+# Manifest of public/ built once at startup (see StaticAssets); restart after a new SPA build
+static_assets = StaticAssets(_PUBLIC_DIR)
+
+
+def _send_public(path: str):
+    """public/<path> from the startup manifest, or the SPA shell if the file is not in it."""
+    if path in static_assets:
+        return static_assets.send(path)
+    return static_assets.send_shell()
+
 # Initialize services
 DATA_DIR = os.getenv("DATA_DIR", "data")
 wordnik_service = WordnikService()
 openai_service = OpenAIService()
 auth_service = AuthService(DATA_DIR)
 challenge_tracker = ChallengeTracker(DATA_DIR)
+# Expired sessions and abandoned Google setup tokens are reaped in the background
+auth_service.start_session_sweeper(float(os.getenv("SESSION_SWEEP_INTERVAL", "3600")))
 
 # Authentication decorator
 def require_auth(f):
@@ -166,6 +227,7 @@ def require_auth(f):
         if not token:
             token = request.cookies.get('authToken')
         
+        # verify_token answers repeat requests from its TTL cache; handlers reuse request.user
         user = auth_service.verify_token(token)
         if not user:
             return jsonify({'error': 'Authentication required'}), 401
@@ -227,12 +289,12 @@ def health():
 @app.route('/')
 def spa_index():
     """Serve React SPA (Vite build copied to public/index.html)."""
-    return send_from_directory(_PUBLIC_DIR, "index.html")
+    return static_assets.send_shell()
 
 @app.route('/landing')
 def landing_page():
     """Legacy HTML landing (optional bookmark). Main app is the SPA at /."""
-    return send_from_directory(_PUBLIC_DIR, "landing.html")
+    return _send_public("landing.html")
 
 
 # Authentication Routes
@@ -328,42 +390,34 @@ def email_login():
         username = email.split('@')[0]
         
         # Check if user exists, if not create one
-        users = auth_service._load_users()
-        if username not in users:
+        user_data = auth_service._get_user(username)
+        if user_data is None:
             # Create new user with email
             user_data = {
                 'username': username,
                 'email': email,
-                'password_hash': auth_service._hash_password('temp_password'),
+                'password_hash': auth_service._unusable_password_hash(),
                 'created_at': datetime.now().isoformat(),
                 'last_login': None,
                 'games_played': 0,
                 'total_score': 0,
                 'best_score': 0
             }
-            users[username] = user_data
-            auth_service._save_users(users)
+            if not auth_service._insert_user(username, user_data):
+                user_data = auth_service._get_user(username)
         
         # Create session
-        session_token = secrets.token_urlsafe(32)
+        session_token = auth_service.create_session(username)
         print(f"🔍 Email login - Created token: {session_token[:20]}...")
-        sessions = auth_service._load_sessions()
-        
-        sessions[session_token] = {
-            'username': username,
-            'created_at': datetime.now().isoformat(),
-            'expires_at': (datetime.now() + timedelta(days=7)).isoformat()
-        }
-        auth_service._save_sessions(sessions)
         print(f"🔍 Email login - Saved session for {username}")
         
         u_email = {
             'username': username,
             'email': email,
-            'created_at': users[username]['created_at'],
-            'games_played': users[username]['games_played'],
-            'total_score': users[username]['total_score'],
-            'best_score': users[username]['best_score'],
+            'created_at': user_data['created_at'],
+            'games_played': user_data['games_played'],
+            'total_score': user_data['total_score'],
+            'best_score': user_data['best_score'],
             'is_admin': _is_admin_username(username),
         }
         response = jsonify({
@@ -403,7 +457,7 @@ def google_login():
 @app.route('/username')
 def username_setup():
     """Serve username selection page for new Google users"""
-    return send_from_directory(_PUBLIC_DIR, "username.html")
+    return _send_public("username.html")
 
 @app.route('/api/auth/setup-google-user', methods=['POST'])
 def setup_google_user():
@@ -432,8 +486,7 @@ def setup_google_user():
             }), 400
         
         # Check if username is already taken
-        users = auth_service._load_users()
-        if username in users:
+        if auth_service._get_user(username) is not None:
             return jsonify({
                 'success': False,
                 'message': 'Username is already taken'
@@ -446,7 +499,7 @@ def setup_google_user():
         user_data = {
             'username': username,
             'email': email,
-            'password_hash': auth_service._hash_password('google_oauth'),
+            'password_hash': auth_service._unusable_password_hash(),
             'created_at': datetime.now().isoformat(),
             'last_login': None,
             'games_played': 0,
@@ -454,19 +507,14 @@ def setup_google_user():
             'best_score': 0
         }
         
-        users[username] = user_data
-        auth_service._save_users(users)
+        if not auth_service._insert_user(username, user_data):
+            return jsonify({
+                'success': False,
+                'message': 'Username is already taken'
+            }), 400
         
         # Create session
-        session_token = secrets.token_urlsafe(32)
-        sessions = auth_service._load_sessions()
-        
-        sessions[session_token] = {
-            'username': username,
-            'created_at': datetime.now().isoformat(),
-            'expires_at': (datetime.now() + timedelta(days=7)).isoformat()
-        }
-        auth_service._save_sessions(sessions)
+        session_token = auth_service.create_session(username)
         
         print(f"🔍 Google user setup: Created user {username}")
         
@@ -547,35 +595,18 @@ def google_callback():
         email = user_info.get('email')
         username = email.split('@')[0] if email else f"google_user_{secrets.token_hex(4)}"
         
-        # Check if user exists by email first, then by username
-        users = auth_service._load_users()
-        existing_user = None
-        existing_username = None
-        
         # Look for existing user by email
-        for user_key, user_data in users.items():
-            if user_data.get('email') == email:
-                existing_user = user_data
-                existing_username = user_key
-                break
+        existing_username = auth_service.find_user_by_email(email)
         
         print(f"🔍 Google OAuth: Email {email}, existing_user: {existing_username}")
         
-        if existing_user:
+        if existing_username:
             # Use existing user - create session and redirect to main page
             username = existing_username
             print(f"🔍 Google OAuth: Found existing user by email: {username}")
             
             # Create session for existing user
-            session_token = secrets.token_urlsafe(32)
-            sessions = auth_service._load_sessions()
-            
-            sessions[session_token] = {
-                'username': username,
-                'created_at': datetime.now().isoformat(),
-                'expires_at': (datetime.now() + timedelta(days=7)).isoformat()
-            }
-            auth_service._save_sessions(sessions)
+            session_token = auth_service.create_session(username)
             
             print(f"🔍 Google OAuth: Created session token: {session_token[:20]}... for existing user: {username}")
             
@@ -619,19 +650,14 @@ def google_callback():
                     print(f"🔍 Google OAuth: User already authenticated, redirecting to main page")
                     return redirect("/")
             
-            # Store Google user info in session for username setup
-            temp_session_token = secrets.token_urlsafe(32)
-            temp_sessions = auth_service._load_sessions()
-            
-            # Store Google user info temporarily
-            temp_sessions[temp_session_token] = {
-                'google_user': True,
-                'email': email,
-                'name': user_info.get('name', ''),
-                'created_at': datetime.now().isoformat(),
-                'expires_at': (datetime.now() + timedelta(hours=1)).isoformat()  # Short expiry for setup
-            }
-            auth_service._save_sessions(temp_sessions)
+            # Store Google user info temporarily (short expiry for setup)
+            temp_session_token = auth_service.create_session(
+                None,
+                ttl=timedelta(hours=1),
+                google_user=True,
+                email=email,
+                name=user_info.get('name', ''),
+            )
             
             # Redirect to username selection page with Google user info
             redirect_url = f'/username?email={email}&name={user_info.get("name", "")}&token={temp_session_token}'
@@ -659,23 +685,26 @@ def get_daily_challenge():
             })
 
         day = _calendar_date_from_request()
-        existing = challenge_tracker.get_challenge_by_date(day) or {}
-        if existing.get('theme') and existing.get('emotion') and existing.get('words'):
-            challenge = {
-                'theme': existing.get('theme'),
-                'emotion': existing.get('emotion'),
-                'words': existing.get('words', []),
-            }
-        else:
+        # Per-process cache of the finished payload (dict + JSON bytes); see ChallengeTracker.get_daily_payload
+        payload = challenge_tracker.get_daily_payload(day)
+        if payload is None:
             # Deterministic-by-date fallback keeps daily prompt stable even without persistent storage.
             challenge = wordnik_service.generate_daily_challenge(day)
             # Save once per date when storage is available.
             challenge_tracker.track_challenge(challenge, target_date=day)
-        
-        return jsonify({
-            'success': True,
-            'challenge': challenge
-        })
+            payload = challenge_tracker.get_daily_payload(day)
+            if payload is None:
+                return jsonify({
+                    'success': True,
+                    'challenge': challenge
+                })
+        
+        body = payload['body']
+        return _conditional_json(
+            lambda: b'{"challenge":' + body + b',"success":true}',
+            day, body,
+            vary='X-Stanzle-Calendar-Date'
+        )
     except Exception as e:
         return jsonify({
             'success': False,
@@ -743,7 +772,7 @@ def not_found(error):
     if request.path.startswith("/api/"):
         return jsonify({"error": "Endpoint not found"}), 404
     if request.method == "GET":
-        return send_from_directory(_PUBLIC_DIR, "index.html")
+        return static_assets.send_shell()
     return jsonify({"error": "Endpoint not found"}), 404
 
 @app.errorhandler(500)
@@ -755,11 +784,7 @@ def internal_error(error):
 def get_daily_submission_status():
     """Check if user can submit today's daily challenge"""
     try:
-        token = request.headers.get('Authorization', '').replace('Bearer ', '')
-        user_data = auth_service.verify_token(token)
-        
-        if not user_data:
-            return jsonify({'success': False, 'error': 'Invalid token'}), 401
+        user_data = request.user
         
         username = user_data['username']
         cd = _calendar_date_from_request()
@@ -777,25 +802,49 @@ def daily_leaderboard():
     """Public: top scores for the request calendar day (browser local date via header or ?date=)."""
     try:
         day = _leaderboard_calendar_date()
-        return jsonify(auth_service.get_daily_leaderboard_for_date(day))
+        return _conditional_json(
+            lambda: auth_service.get_daily_leaderboard_for_date(day),
+            day, auth_service.get_daily_leaderboard_version(day),
+            vary="X-Stanzle-Calendar-Date"
+        )
     except Exception as e:
         print(f"Error in daily leaderboard: {e}")
         return jsonify({"success": False, "error": "Internal server error"}), 500
 
 
+@app.route("/api/daily/percentile", methods=["GET"])
+def daily_percentile():
+    """Public: rank and percentile a ?score= would have among the day's submissions."""
+    try:
+        score = request.args.get("score", type=int)
+        if score is None or not 0 <= score <= 100:
+            return jsonify({"success": False, "error": "score must be an integer from 0 to 100"}), 400
+        return jsonify(auth_service.get_daily_percentile(score, _leaderboard_calendar_date()))
+    except Exception as e:
+        print(f"Error in daily percentile: {e}")
+        return jsonify({"success": False, "error": "Internal server error"}), 500
+
+
+@app.route("/api/leaderboard/streaks", methods=["GET"])
+def streak_leaderboard():
+    """Public: top live streaks (?kind=longest for all-time longest runs), ?limit= up to 100."""
+    try:
+        kind = "longest" if request.args.get("kind") == "longest" else "current"
+        limit = max(1, min(request.args.get("limit", default=10, type=int), 100))
+        return jsonify(
+            auth_service.get_streak_leaderboard(limit=limit, kind=kind, today=_calendar_date_from_request())
+        )
+    except Exception as e:
+        print(f"Error in streak leaderboard: {e}")
+        return jsonify({"success": False, "error": "Internal server error"}), 500
+
+
 @app.route('/api/daily/submit', methods=['POST'])
 @require_auth
 def submit_daily_score():
     """Submit daily score"""
     try:
-        token = request.headers.get('Authorization', '').replace('Bearer ', '')
-        print(f"🔍 Daily submit - Token: {token[:20] if token else 'None'}...")
-        
-        user_data = auth_service.verify_token(token)
-        print(f"🔍 Daily submit - User data: {user_data is not None}")
-        
-        if not user_data:
-            return jsonify({'success': False, 'error': 'Invalid token'}), 401
+        user_data = request.user
         
         data = request.get_json()
         print(f"🔍 Daily submit - Request data: {data}")
@@ -827,22 +876,9 @@ def submit_daily_score():
             username, int(score), submission_data, calendar_date=cd
         )
         
-        # Update challenge statistics
+        # Update challenge statistics (read-modify-write happens under the store's lock)
         if result.get('success'):
-            # Get current stats and update them
-            current_challenge = challenge_tracker.get_challenge_by_date(cd)
-            if current_challenge:
-                new_submissions = current_challenge.get('submissions_count', 0) + 1
-                current_avg = current_challenge.get('avg_score', 0.0)
-                new_avg = ((current_avg * (new_submissions - 1)) + int(score)) / new_submissions
-                best_score = max(current_challenge.get('best_score', 0), int(score))
-                
-                challenge_tracker.update_challenge_stats(
-                    cd, 
-                    submissions_count=new_submissions,
-                    avg_score=new_avg,
-                    best_score=best_score
-                )
+            challenge_tracker.increment_stats(cd, int(score))
         
         return jsonify(result)
     
@@ -855,34 +891,48 @@ def submit_daily_score():
 def get_submission_history():
     """Get user's detailed submission history"""
     try:
-        token = request.headers.get('Authorization', '').replace('Bearer ', '')
-        user_data = auth_service.verify_token(token)
-        
-        if not user_data:
-            return jsonify({'success': False, 'error': 'Invalid token'}), 401
+        user_data = request.user
         
         username = user_data['username']
-        result = auth_service.get_submission_history(username)
+        try:
+            page = _page_request()
+            if page is None:
+                return jsonify(auth_service.get_submission_history(username))
+            result = auth_service.get_submission_history_page(username, *page)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
         
+        if result.get('success'):
+            result['next_cursor'] = encode_cursor(result.pop('next_before'))
         return jsonify(result)
     
     except Exception as e:
         print(f"Error in submission history endpoint: {e}")
         return jsonify({'success': False, 'error': 'Internal server error'}), 500
 
+@app.route('/api/user/calendar', methods=['GET'])
+@require_auth
+def get_score_calendar():
+    """Per-day scores for ?year=YYYY (default: the request's calendar year) for a heatmap"""
+    try:
+        year = request.args.get('year', type=int) or int(_calendar_date_from_request()[:4])
+        if not 2000 <= year <= 2100:
+            return jsonify({'success': False, 'error': 'Invalid year'}), 400
+        return jsonify(auth_service.get_score_calendar(request.user['username'], year))
+    
+    except Exception as e:
+        print(f"Error in score calendar endpoint: {e}")
+        return jsonify({'success': False, 'error': 'Internal server error'}), 500
+
 @app.route('/api/daily/history', methods=['GET'])
 @require_auth
 def get_daily_score_history():
     """Get user's daily score history"""
     try:
-        token = request.headers.get('Authorization', '').replace('Bearer ', '')
-        user_data = auth_service.verify_token(token)
-        
-        if not user_data:
-            return jsonify({'success': False, 'error': 'Invalid token'}), 401
+        user_data = request.user
         
         username = user_data['username']
-        history = auth_service.get_daily_score_history(username)
+        history = auth_service.get_daily_score_history(username, _calendar_date_from_request())
         
         return jsonify(history)
     
@@ -896,30 +946,29 @@ def get_daily_score_history():
 def admin_overview():
     """Aggregate stats for operator dashboard."""
     try:
-        users = auth_service._load_users()
-        total_subs = sum(len((u.get("submission_history") or {})) for u in users.values())
-        challenges = challenge_tracker.get_all_challenges()
-        ch_list = sorted(challenges.keys(), reverse=True)[:14]
+        # Live counters (see MetricsRegistry); nothing here scans users or sessions
+        counters = auth_service.get_overview_counters()
+        today = _calendar_date_from_request()
         challenge_preview = [
             {
-                "date": d,
-                "theme": (challenges.get(d) or {}).get("theme"),
-                "emotion": (challenges.get(d) or {}).get("emotion"),
-                "submissions_count": (challenges.get(d) or {}).get("submissions_count", 0),
-                "avg_score": (challenges.get(d) or {}).get("avg_score", 0),
-                "best_score": (challenges.get(d) or {}).get("best_score", 0),
+                "date": c.get("date"),
+                "theme": c.get("theme"),
+                "emotion": c.get("emotion"),
+                "submissions_count": c.get("submissions_count", 0),
+                "avg_score": c.get("avg_score", 0),
+                "best_score": c.get("best_score", 0),
+                "score_stddev": c.get("score_stddev"),
             }
-            for d in ch_list
+            for c in challenge_tracker.get_recent_challenges(14, until=today)
         ]
         return jsonify(
             {
                 "success": True,
                 "overview": {
-                    "user_count": len(users),
-                    "active_sessions": auth_service.count_active_sessions(),
-                    "total_daily_submissions_recorded": total_subs,
-                    "tracked_challenge_days": len(challenges),
+                    **counters,
+                    "tracked_challenge_days": challenge_tracker.count_challenges(until=today),
                     "data_dir": DATA_DIR,
+                    "storage_cache": auth_service.cache_stats(),
                 },
                 "recent_tracked_challenges": challenge_preview,
             }
@@ -933,7 +982,14 @@ def admin_overview():
 @require_admin
 def admin_users():
     try:
-        return jsonify({"success": True, "users": auth_service.get_admin_user_summaries()})
+        try:
+            page = _page_request()
+            if page is None:
+                return jsonify({"success": True, "users": auth_service.get_admin_user_summaries()})
+            result = auth_service.get_admin_users_page(*page)
+        except ValueError:
+            return jsonify({"success": False, "error": "Invalid cursor"}), 400
+        return jsonify({"success": True, "users": result["users"], "next_cursor": encode_cursor(result["next_cursor"])})
     except Exception as e:
         print(f"Error in admin users: {e}")
         return jsonify({"success": False, "error": "Internal server error"}), 500
@@ -943,27 +999,108 @@ def admin_users():
 @require_admin
 def admin_submissions():
     try:
-        lim = request.args.get("limit", default="80", type=int)
-        return jsonify(
-            {
-                "success": True,
-                "submissions": auth_service.get_admin_recent_submissions(lim or 80),
-            }
-        )
+        lim = request.args.get("limit", default=80, type=int)
+        try:
+            page = auth_service.get_admin_submissions_page(lim or 80, decode_cursor(request.args.get("cursor")))
+        except ValueError:
+            return jsonify({"success": False, "error": "Invalid cursor"}), 400
+        return jsonify({"success": True, "submissions": page["submissions"],
+                        "next_cursor": encode_cursor(page["next_cursor"])})
     except Exception as e:
         print(f"Error in admin submissions: {e}")
         return jsonify({"success": False, "error": "Internal server error"}), 500
 
 
+def _archive_range_request():
+    """
+    (first, last) dates from ?from=&to= (either optional) or ?year=[&month=], else None.
+    Raises ValueError with a client-facing message on bad input.
+    """
+    args = request.args
+    if "year" in args or "month" in args:
+        year = args.get("year", type=int)
+        month = args.get("month", type=int)
+        if year is None or not 1 <= year <= 9999 or ("month" in args and (month is None or not 1 <= month <= 12)):
+            raise ValueError("year must be YYYY and month 1-12")
+        if month is None:
+            return f"{year:04d}-01-01", f"{year:04d}-12-31"
+        return f"{year:04d}-{month:02d}-01", f"{year:04d}-{month:02d}-{calendar.monthrange(year, month)[1]:02d}"
+    if "from" in args or "to" in args:
+        first = (args.get("from") or "0000-01-01").strip()
+        last = (args.get("to") or "9999-12-31").strip()
+        if not (_CAL_DATE_RE.match(first) and _CAL_DATE_RE.match(last)) or first > last:
+            raise ValueError("from/to must be YYYY-MM-DD with from <= to")
+        return first, last
+    return None
+
+
+@app.route("/api/admin/schedule", methods=["POST"])
+@require_admin
+def admin_schedule():
+    """Store daily challenges for JSON `days` (default 365, max 3650) dates from `start` (default UTC today)."""
+    try:
+        data = request.get_json(silent=True) or {}
+        days = int(data.get("days", 365))
+        start = (data.get("start") or _utc_calendar_date_str()).strip()
+        if not 1 <= days <= 3650 or not _CAL_DATE_RE.match(start):
+            return jsonify({"success": False, "error": "days must be 1-3650 and start YYYY-MM-DD"}), 400
+        result = challenge_tracker.schedule_challenges(wordnik_service.generate_challenge_schedule, days, start)
+        return jsonify({"success": True, **result})
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "days must be 1-3650 and start YYYY-MM-DD"}), 400
+    except Exception as e:
+        print(f"Error in admin schedule: {e}")
+        return jsonify({"success": False, "error": "Internal server error"}), 500
+
+
 @app.route('/api/archive/challenges', methods=['GET'])
 def get_challenge_archive():
-    """Get all tracked challenges for archive mode"""
+    """
+    Tracked challenges for archive mode: all of them, a ?from=&to= date range (or ?year= with
+    optional ?month=), or newest-first pages with ?limit=&cursor=
+    """
     try:
-        challenges = challenge_tracker.get_all_challenges()
-        return jsonify({
-            'success': True,
-            'challenges': challenges
-        })
+        try:
+            page = _page_request()
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+        try:
+            date_range = _archive_range_request()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        # Scheduled challenges stay hidden until their day
+        until = _calendar_date_from_request()
+        # The URL (limit/cursor) is part of the cache key; the archive version covers the data
+        version = challenge_tracker.get_archive_version()
+        if date_range is not None:
+            first, last = date_range
+            return _conditional_json(
+                lambda: {
+                    'success': True,
+                    'from': first,
+                    'to': last,
+                    'challenges': challenge_tracker.get_challenges_range(first, min(last, until))
+                },
+                request.query_string.decode(), until, version,
+                vary='X-Stanzle-Calendar-Date'
+            )
+        if page is None:
+            return _conditional_json(
+                lambda: {'success': True, 'challenges': challenge_tracker.get_all_challenges(until)},
+                request.query_string.decode(), until, version,
+                vary='X-Stanzle-Calendar-Date'
+            )
+        
+        def _build_page():
+            result = challenge_tracker.get_challenges_page(*page, until=until)
+            return {
+                'success': True,
+                'challenges': result['challenges'],
+                'next_cursor': encode_cursor(result['next_before'])
+            }
+        
+        return _conditional_json(_build_page, request.query_string.decode(), until, version,
+                                 vary='X-Stanzle-Calendar-Date')
     except Exception as e:
         print(f"Error in challenge archive endpoint: {e}")
         return jsonify({'success': False, 'error': 'Internal server error'}), 500
@@ -973,11 +1110,14 @@ def get_challenge_by_date(date):
     """Get a specific challenge by date (YYYY-MM-DD format)"""
     try:
         challenge = challenge_tracker.get_challenge_by_date(date)
-        if challenge:
-            return jsonify({
-                'success': True,
-                'challenge': challenge
-            })
+        # Scheduled challenges stay hidden until their day
+        if challenge and date <= _calendar_date_from_request():
+            # The per-record version restarts when the file is recreated or re-imported, so the
+            # record's content goes into the tag too (it is one small dict already in hand)
+            return _conditional_json(
+                lambda: {'success': True, 'challenge': challenge},
+                date, challenge.get('version', 0), json.dumps(challenge, sort_keys=True)
+            )
         else:
             return jsonify({
                 'success': False,
@@ -989,14 +1129,19 @@ def get_challenge_by_date(date):
 
 @app.route('/api/archive/export', methods=['GET'])
 def export_challenges():
-    """Export all challenges to CSV"""
+    """Stream every past challenge as a CSV (default) or ?format=ndjson download"""
     try:
-        output_file = challenge_tracker.export_challenges_csv()
-        return jsonify({
-            'success': True,
-            'message': f'Challenges exported to {output_file}',
-            'file_path': output_file
-        })
+        fmt = (request.args.get('format') or 'csv').strip().lower()
+        until = _calendar_date_from_request()
+        if fmt == 'ndjson':
+            rows, mimetype = challenge_tracker.iter_challenges_ndjson(until), 'application/x-ndjson'
+        elif fmt == 'csv':
+            rows, mimetype = challenge_tracker.iter_challenges_csv(until), 'text/csv'
+        else:
+            return jsonify({'success': False, 'error': 'format must be csv or ndjson'}), 400
+        response = app.response_class(rows, mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="stanzle-challenges-{until}.{fmt}"'
+        return response
     except Exception as e:
         print(f"Error in export challenges endpoint: {e}")
         return jsonify({'success': False, 'error': 'Internal server error'}), 500
@@ -1030,10 +1175,7 @@ def static_or_spa(requested_path):
         return jsonify({'error': 'Not found'}), 404
     if ".." in requested_path or requested_path.startswith(("/", "\\")):
         return jsonify({"error": "Invalid path"}), 404
-    full_path = os.path.join(_PUBLIC_DIR, requested_path)
-    if os.path.isfile(full_path):
-        return send_from_directory(_PUBLIC_DIR, requested_path)
-    return send_from_directory(_PUBLIC_DIR, "index.html")
+    return _send_public(requested_path)
 
 
 if __name__ == '__main__':
@@ -24,5 +24,13 @@ echo "==> Copying dist -> $APP_ROOT/public"
 rm -rf "$APP_ROOT/public/assets"
 cp -r "$FRONTEND/dist/assets" "$APP_ROOT/public/assets"
 cp "$FRONTEND/dist/index.html" "$APP_ROOT/public/index.html"
+rm -rf "$APP_ROOT/public/.vite"
+if [[ -f "$FRONTEND/dist/.vite/manifest.json" ]]; then
+  mkdir -p "$APP_ROOT/public/.vite"
+  cp "$FRONTEND/dist/.vite/manifest.json" "$APP_ROOT/public/.vite/manifest.json"
+fi
+
+echo "==> Precompressing public/ (.gz, plus .br if the brotli package is installed)"
+python3 "$SCRIPT_DIR/precompress.py" --dir "$APP_ROOT/public"
 
 echo "==> SPA ready (public/index.html + public/assets/)"
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Rewrite data/daily_challenges.csv from daily_challenges.json: one current row per date, oldest first
+Usage: python scripts/compact_challenges_csv.py [--data-dir data]
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backend.services.challenge_tracker import ChallengeTracker
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the challenge CSV log")
+    parser.add_argument("--data-dir", default=os.getenv("DATA_DIR", "data"))
+    args = parser.parse_args()
+    
+    print("🗜️  Compacting daily_challenges.csv")
+    print("=" * 50)
+    
+    tracker = ChallengeTracker(args.data_dir)
+    with open(tracker.challenges_csv) as f:
+        before = max(sum(1 for _ in f) - 1, 0)
+    rows = tracker.compact_csv()
+    print(f"✅ Rewrote {rows} rows (was {before})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+One-shot import of users.json / sessions.json into the SQLite storage engine
+Usage: python scripts/import_auth_data.py [--data-dir data] [--force]
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backend.services.storage import import_json_collection, open_engine
+
+def main():
+    parser = argparse.ArgumentParser(description="Import JSON auth data into SQLite")
+    parser.add_argument("--data-dir", default=os.getenv("DATA_DIR", "data"))
+    parser.add_argument("--force", action="store_true", help="Replace records already in the database")
+    args = parser.parse_args()
+    
+    print("📦 Importing auth data into SQLite")
+    print("=" * 50)
+    
+    engine = open_engine(args.data_dir, "sqlite")
+    for name in ("users", "sessions"):
+        json_path = os.path.join(args.data_dir, f"{name}.json")
+        count = import_json_collection(engine, name, json_path, force=args.force)
+        if count:
+            print(f"✅ Imported {count} {name} from {json_path}")
+        else:
+            print(f"⏭️  Skipped {name} (nothing to import, or database already populated; use --force)")
+    # The app's startup import is one-time; this script (with --force) is the only re-import
+    engine.collection("meta").put("legacy_json_imported", datetime.now().isoformat())
+    
+    print(f"\n📁 Database: {engine.db_path}")
+    print("Set STORAGE_BACKEND=sqlite to serve from it.")
+
+if __name__ == "__main__":
+    main()
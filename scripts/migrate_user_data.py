@@ -1,19 +1,40 @@
 #!/usr/bin/env python3
 """
 Migration script to convert existing daily_scores to submission_history format
+
+Legacy: only for data that predates per-day submission partitions. Once AuthService has
+moved submission_history into data/submissions/ this would re-embed it, so it refuses to run.
 """
 import sys
 import os
 import json
 from datetime import datetime
 
-# Add the backend services directory to the Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '../src/backend/services'))
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backend.services.persistence import atomic_write_json
+from src.backend.services.storage import open_engine
+
+
+def _already_partitioned(data_dir: str) -> bool:
+    """
+    True once submissions live in day partitions, on whichever backend STORAGE_BACKEND names:
+    the engine's migration flag, or any submissions/<day> partition
+    """
+    engine = open_engine(data_dir)
+    return bool(engine.collection("meta").get("submissions_partitioned") or engine.collection_names("submissions/"))
+
 
 def migrate_user_data():
     """Migrate existing daily_scores to submission_history format"""
     print("🔄 Migrating user data to new submission_history format...")
     
+    if _already_partitioned('data'):
+        print("❌ Submissions are already partitioned by day; nothing to migrate")
+        print("   Running this would copy placeholder history back into every user record.")
+        return
+    
     # Load users data
     users_file = 'data/users.json'
     if not os.path.exists(users_file):
@@ -55,8 +76,7 @@ def migrate_user_data():
             print(f"   ✅ Migrated {len(user_data['daily_scores'])} submissions")
     
     # Save updated users data
-    with open(users_file, 'w') as f:
-        json.dump(users, f, indent=2)
+    atomic_write_json(users_file, users)
     
     print(f"🎉 Migration complete! Migrated {migrated_count} submissions across {len(users)} users")
 
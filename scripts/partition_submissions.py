@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Move embedded submission_history out of user records into per-day partitions
+Usage: python scripts/partition_submissions.py [--data-dir data] [--backend json]
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backend.services.auth_service import partition_submission_history
+from src.backend.services.storage import open_engine
+
+def main():
+    parser = argparse.ArgumentParser(description="Partition submission history by calendar day")
+    parser.add_argument("--data-dir", default=os.getenv("DATA_DIR", "data"))
+    parser.add_argument("--backend", default=None, help="json, sqlite or memory (default: STORAGE_BACKEND)")
+    args = parser.parse_args()
+    
+    print("🗂️  Partitioning submission history")
+    print("=" * 50)
+    
+    # The bare engine, not AuthService: its constructor would already have run the migration
+    engine = open_engine(args.data_dir, args.backend)
+    moved = partition_submission_history(engine)
+    engine.collection("meta").put("submissions_partitioned", datetime.now().isoformat())
+    print(f"✅ Moved {moved} submissions into day partitions")
+    print(f"📅 Partitions: {len(engine.collection_names('submissions/'))}")
+
+if __name__ == "__main__":
+    main()
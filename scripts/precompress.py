@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Write .gz (and .br, if the brotli package is installed) next to every text asset in public/
+so static requests are served precompressed with no per-request CPU
+Usage: python scripts/precompress.py [--dir public] [--min-size 1024] [--force]
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backend.services.persistence import atomic_write_bytes
+from src.backend.utils.compression import COMPRESSIBLE_EXTENSIONS, ENCODING_SUFFIX, SUPPORTED_ENCODINGS, compress
+
+def precompress_file(path: str, min_size: int, force: bool) -> dict:
+    """Compressed bytes written per encoding for one file (skips small, incompressible or fresh ones)"""
+    written = {}
+    source_mtime = os.path.getmtime(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    for encoding in SUPPORTED_ENCODINGS:
+        target = path + ENCODING_SUFFIX[encoding]
+        if len(data) < min_size:
+            # Too small to bother; drop any stale sibling so it cannot shadow the new file
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+        if not force and os.path.exists(target) and os.path.getmtime(target) >= source_mtime:
+            continue
+        compressed = compress(data, encoding, best=True)
+        if len(compressed) >= len(data):
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+        atomic_write_bytes(target, compressed)
+        written[encoding] = len(compressed)
+    # A .br from a build that had brotli would otherwise keep serving old bytes
+    for encoding, suffix in ENCODING_SUFFIX.items():
+        stale = path + suffix
+        if encoding not in SUPPORTED_ENCODINGS and os.path.exists(stale) and os.path.getmtime(stale) < source_mtime:
+            os.remove(stale)
+    return written
+
+def main():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Precompress static assets")
+    parser.add_argument("--dir", default=os.path.join(project_root, "public"))
+    parser.add_argument("--min-size", type=int, default=int(os.getenv("COMPRESS_MIN_SIZE", "1024")))
+    parser.add_argument("--force", action="store_true", help="rewrite siblings even if they look up to date")
+    args = parser.parse_args()
+
+    print(f"🗜️  Precompressing {args.dir} ({', '.join(SUPPORTED_ENCODINGS)})")
+    print("=" * 50)
+
+    files = 0
+    original_total = 0
+    compressed_total = {encoding: 0 for encoding in SUPPORTED_ENCODINGS}
+    for root, _, names in os.walk(args.dir):
+        for name in sorted(names):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            written = precompress_file(path, args.min_size, args.force)
+            if not written:
+                continue
+            files += 1
+            size = os.path.getsize(path)
+            original_total += size
+            sizes = ", ".join(f"{enc} {n:,}" for enc, n in written.items())
+            print(f"📦 {os.path.relpath(path, args.dir)}: {size:,} -> {sizes}")
+            for encoding, n in written.items():
+                compressed_total[encoding] += n
+
+    print(f"✅ Precompressed {files} files ({original_total:,} bytes)")
+    for encoding, n in compressed_total.items():
+        if n:
+            print(f"   {encoding}: {n:,} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Recompute the per-day leaderboard aggregates (daily_stats), streaks, the admin
+submission index and the overview counters from stored user records and submissions
+Usage: python scripts/rebuild_leaderboards.py [--data-dir data] [--backend json]
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backend.services.auth_service import AuthService
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild per-day leaderboards")
+    parser.add_argument("--data-dir", default=os.getenv("DATA_DIR", "data"))
+    parser.add_argument("--backend", default=None, help="json, sqlite or memory (default: STORAGE_BACKEND)")
+    args = parser.parse_args()
+    
+    print("🏆 Rebuilding daily leaderboards")
+    print("=" * 50)
+    
+    auth_service = AuthService(args.data_dir, backend=args.backend)
+    days = auth_service.rebuild_daily_stats()
+    print(f"✅ Rebuilt leaderboards for {days} days")
+    users = auth_service.rebuild_streaks()
+    print(f"🔥 Rebuilt streaks for {users} users")
+    rows = auth_service.rebuild_submission_index()
+    print(f"🗂️  Re-indexed {rows} submissions")
+    users = auth_service.rebuild_user_index()
+    print(f"👥 Re-indexed {users} users")
+    drift = auth_service.reconcile_metrics()
+    print(f"📊 Reconciled overview counters ({len(drift)} had drifted)")
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,14 @@ def reset_all_accounts():
     files_to_reset = [
         'users.json',
         'sessions.json',
-        'challenges.json'
+        'challenges.json',
+        'daily_stats.json',
+        'leaderboards.json',
+        'submission_index.jsonl',
+        'user_index.jsonl',
+        'metrics.json',
+        'user_emails.json',
+        'meta.json'
     ]
     
     # Create backup directory
@@ -47,6 +54,49 @@ def reset_all_accounts():
         json.dump({}, f)
     print("✅ Reset sessions.json")
     
+    # Reset sessions.log (append-only session store)
+    sessions_log = os.path.join(data_dir, 'sessions.log')
+    if os.path.exists(sessions_log):
+        shutil.copy2(sessions_log, os.path.join(backup_dir, 'sessions.log'))
+        open(sessions_log, 'w').close()
+        print("✅ Reset sessions.log")
+    
+    # Reset daily_stats.json / leaderboards.json / metrics.json (aggregates and counters),
+    # user_emails.json (email -> username index) and meta.json (rebuild markers)
+    for aggregate in ('daily_stats.json', 'leaderboards.json', 'metrics.json', 'user_emails.json', 'meta.json'):
+        aggregate_file = os.path.join(data_dir, aggregate)
+        if os.path.exists(aggregate_file):
+            with open(aggregate_file, 'w') as f:
+                json.dump({}, f)
+            print(f"✅ Reset {aggregate}")
+    
+    # Remove submissions/ (one file per day) and history/ (one log per user);
+    # rebuild_leaderboards.py would otherwise re-index the poems
+    for partition_dir in ('submissions', 'history'):
+        partition_path = os.path.join(data_dir, partition_dir)
+        if os.path.isdir(partition_path):
+            shutil.copytree(partition_path, os.path.join(backup_dir, partition_dir), dirs_exist_ok=True)
+            shutil.rmtree(partition_path)
+            print(f"✅ Reset {partition_dir}/")
+    
+    # Reset submission_index.jsonl / user_index.jsonl (admin paging logs)
+    for index_name in ('submission_index.jsonl', 'user_index.jsonl'):
+        index_file = os.path.join(data_dir, index_name)
+        if os.path.exists(index_file):
+            open(index_file, 'w').close()
+            print(f"✅ Reset {index_name}")
+    
+    # With STORAGE_BACKEND=sqlite, users, sessions and every index live in stanzle.db;
+    # removing it (and its WAL files) also lets the one-time legacy JSON import run again
+    if os.getenv('STORAGE_BACKEND', 'json').strip().lower() == 'sqlite':
+        db_path = os.getenv('SQLITE_PATH') or os.path.join(data_dir, 'stanzle.db')
+        for db_file in (db_path, f'{db_path}-wal', f'{db_path}-shm'):
+            if os.path.exists(db_file):
+                os.makedirs(backup_dir, exist_ok=True)
+                shutil.copy2(db_file, os.path.join(backup_dir, os.path.basename(db_file)))
+                os.remove(db_file)
+                print(f"✅ Removed {os.path.basename(db_file)}")
+    
     # Reset challenges.json
     challenges_file = os.path.join(data_dir, 'challenges.json')
     with open(challenges_file, 'w') as f:
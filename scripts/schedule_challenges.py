@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Store the next N days of daily challenges so requests only read them (run from cron to keep ahead)
+Usage: python scripts/schedule_challenges.py [--days 365] [--start YYYY-MM-DD] [--data-dir data]
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backend.services.challenge_tracker import ChallengeTracker
+from src.backend.services.wordnik_service import WordnikService
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule upcoming daily challenges")
+    parser.add_argument("--data-dir", default=os.getenv("DATA_DIR", "data"))
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--start", default=None, help="first date (default: today, UTC)")
+    args = parser.parse_args()
+    
+    start = args.start or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    
+    print(f"📅 Scheduling {args.days} daily challenges from {start}")
+    print("=" * 50)
+    
+    tracker = ChallengeTracker(args.data_dir)
+    result = tracker.schedule_challenges(WordnikService().generate_challenge_schedule, args.days, start)
+    print(f"✅ Scheduled {result['scheduled']} new days ({result['skipped']} already set)")
+    print(f"🗓️  Covered {result['first_date']} through {result['last_date']}")
+
+if __name__ == "__main__":
+    main()
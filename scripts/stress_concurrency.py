@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Stress test for multi-worker deployments: several processes share one data directory,
+log in and submit scores at the same time, then every write is checked for loss.
+Usage: python scripts/stress_concurrency.py [--processes 8] [--users 64] [--days 3] [--backend json]
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backend.services.auth_service import AuthService
+from src.backend.services.challenge_tracker import ChallengeTracker
+
+PASSWORD = "Stress123!"
+# This exercises storage, not password hashing; keep bcrypt at its minimum cost
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+def _days(count):
+    start = date.today() - timedelta(days=count - 1)
+    return [(start + timedelta(days=i)).isoformat() for i in range(count)]
+
+def _worker(data_dir, backend, usernames, days, barrier):
+    """Run in a child process: log each user in, then submit every day twice."""
+    auth_service = AuthService(data_dir, backend=backend)
+    tracker = ChallengeTracker(data_dir)
+    barrier.wait()
+    for day in days:
+        for username in usernames:
+            auth_service.login_user(username, PASSWORD)
+            score = len(username) + len(day)
+            result = auth_service.submit_daily_score(username, score, {'poem_text': f'{username} {day}'}, calendar_date=day)
+            if result.get('success'):
+                tracker.increment_stats(day, score)
+            # A retry from a second tab must be rejected, not double counted
+            auth_service.submit_daily_score(username, score, {'poem_text': 'retry'}, calendar_date=day)
+    # Child processes skip atexit hooks; fold pending counters in before exiting
+    auth_service.metrics.checkpoint()
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent submission stress test")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--users", type=int, default=64)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--backend", default=os.getenv("STORAGE_BACKEND", "json"), choices=["json", "sqlite"])
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch data directory")
+    args = parser.parse_args()
+
+    print("🧪 Concurrency stress test")
+    print("=" * 50)
+
+    data_dir = tempfile.mkdtemp(prefix="stanzle-stress-")
+    days = _days(args.days)
+    usernames = [f"stress{i:04d}" for i in range(args.users)]
+
+    auth_service = AuthService(data_dir, backend=args.backend)
+    tracker = ChallengeTracker(data_dir)
+    for username in usernames:
+        auth_service.register_user(username, f"{username}@example.com", PASSWORD)
+    for day in days:
+        tracker.track_challenge({'theme': 'Stress', 'emotion': 'Calm', 'words': []}, target_date=day)
+    auth_service.metrics.checkpoint()
+
+    print(f"📁 Data dir: {data_dir} ({args.backend})")
+    print(f"👥 {args.users} users x {args.days} days across {args.processes} processes")
+
+    barrier = multiprocessing.Barrier(args.processes)
+    procs = [
+        multiprocessing.Process(
+            target=_worker,
+            args=(data_dir, args.backend, usernames[i::args.processes], days, barrier),
+        )
+        for i in range(args.processes)
+    ]
+    started = time.time()
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    elapsed = time.time() - started
+
+    # Verify from a fresh instance so nothing is served from this process's caches
+    auth_service = AuthService(data_dir, backend=args.backend)
+    tracker = ChallengeTracker(data_dir)
+    errors = []
+
+    if any(p.exitcode != 0 for p in procs):
+        errors.append("a worker process exited with an error")
+    for username in usernames:
+        user = auth_service._get_user(username) or {}
+        if user.get('games_played') != args.days:
+            errors.append(f"{username}: games_played={user.get('games_played')} expected {args.days}")
+        if [day for day, _ in auth_service._calendar_of(user).days()] != days:
+            errors.append(f"{username}: score calendar missing days")
+    for day in days:
+        stored = auth_service._submissions_on(day).count()
+        if stored != args.users:
+            errors.append(f"{day}: {stored} stored submissions, expected {args.users}")
+        board = auth_service.get_daily_leaderboard_for_date(day).get('submission_count')
+        if board != args.users:
+            errors.append(f"{day}: leaderboard counts {board}, expected {args.users}")
+        count = tracker.get_challenge_by_date(day).get('submissions_count')
+        if count != args.users:
+            errors.append(f"{day}: submissions_count={count}, expected {args.users}")
+    indexed = len(auth_service.get_admin_recent_submissions(500))
+    if indexed != min(args.users * args.days, 500):
+        errors.append(f"submission index: {indexed} rows, expected {args.users * args.days}")
+    counters = auth_service.get_overview_counters()
+    if counters['user_count'] != args.users:
+        errors.append(f"metrics: {counters['user_count']} users counted")
+    if counters['total_daily_submissions_recorded'] != args.users * args.days:
+        errors.append(f"metrics: {counters['total_daily_submissions_recorded']} submissions counted")
+    if counters['active_sessions'] != auth_service.count_active_sessions():
+        errors.append(f"metrics: {counters['active_sessions']} active sessions counted")
+    sessions = auth_service.count_active_sessions()
+    expected_sessions = args.users * args.days
+    if sessions != expected_sessions:
+        errors.append(f"sessions: {sessions} live, expected {expected_sessions}")
+
+    writes = args.users * args.days * 3
+    print(f"⏱️  {writes} writes in {elapsed:.2f}s ({writes / elapsed:.0f}/s)")
+    if errors:
+        print(f"❌ {len(errors)} lost or duplicated writes:")
+        for e in errors[:20]:
+            print(f"   - {e}")
+    else:
+        print("✅ No lost updates")
+
+    if not args.keep:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    sys.exit(1 if errors else 0)
+
+if __name__ == "__main__":
+    main()
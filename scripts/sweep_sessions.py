@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Remove expired sessions and abandoned Google setup tokens in one pass
+Usage: python scripts/sweep_sessions.py [--data-dir data] [--backend json]
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.backend.services.auth_service import AuthService
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep expired sessions")
+    parser.add_argument("--data-dir", default=os.getenv("DATA_DIR", "data"))
+    parser.add_argument("--backend", default=None, help="json, sqlite or memory (default: STORAGE_BACKEND)")
+    args = parser.parse_args()
+    
+    print("🧹 Sweeping expired sessions")
+    print("=" * 50)
+    
+    auth_service = AuthService(args.data_dir, backend=args.backend)
+    before = auth_service._sessions_store.count()
+    removed = auth_service.sweep_expired_sessions()
+    print(f"✅ Reclaimed {removed} of {before} sessions")
+    print(f"🔑 Active sessions: {auth_service.count_active_sessions()}")
+
+if __name__ == "__main__":
+    main()
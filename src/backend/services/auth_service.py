@@ -3,49 +3,153 @@ Authentication Service for Stanzle Game
 Handles user registration, login, and session management
 """
 
-import hashlib
+import bisect
 import re
 import secrets
-import json
 import os
-from datetime import datetime, timedelta
+import threading
+import time
+from datetime import date, datetime, timedelta
 from typing import Optional, Dict, Any, List
 
+from src.backend.services.storage import (
+    JsonCollection,
+    JsonEngine,
+    MemoryEngine,
+    SqliteEngine,
+    StorageEngine,
+    import_json_collection,
+    open_engine,
+)
+from src.backend.services.persistence import atomic_write_json
+from src.backend.services.metrics import MetricsRegistry
+from src.backend.services.password_hasher import PasswordHasher, PasswordHasherBusy
+from src.backend.services.score_calendar import ScoreCalendar
+from src.backend.services.session_log import SessionLog
+from src.backend.services.token_cache import TokenCache
+
+def history_log_name(username: str) -> str:
+    """
+    Append log holding one user's detailed submissions in submit order. Named by the hex
+    username: usernames are not restricted to path-safe characters.
+    """
+    return f"history/{username.encode('utf-8').hex()}"
+
+def partition_submission_history(engine: StorageEngine) -> int:
+    """
+    Move embedded submission_history out of every user record in `engine` into day partitions
+    ('submissions/<day>') and the per-user history logs. Idempotent; returns how many
+    submissions were moved. Works on a bare engine so scripts can run it without AuthService.
+    """
+    users = engine.collection("users")
+    moved = 0
+    for username, user_data in users.items():
+        history = user_data.get('submission_history')
+        if not isinstance(history, dict):
+            continue
+        for day, submission in sorted(history.items()):
+            if isinstance(submission, dict):
+                inserted = engine.collection(f"submissions/{day}").update(
+                    username, lambda current, sub=submission: (None, False) if current is not None else (sub, True)
+                )
+                if inserted:
+                    engine.log(history_log_name(username)).append(dict(submission, date=day))
+                moved += 1
+        
+        def _strip(current):
+            if current is None or 'submission_history' not in current:
+                return None, None
+            legacy = current.pop('submission_history') or {}
+            current['submission_count'] = current.get('submission_count', 0) + len(legacy)
+            return current, None
+        
+        users.update(username, _strip)
+    return moved
+
 class AuthService:
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", backend: Optional[str] = None):
         self.data_dir = data_dir
         self.users_file = os.path.join(data_dir, "users.json")
         self.sessions_file = os.path.join(data_dir, "sessions.json")
         
-        # Initialize memory storage attributes
-        self._use_memory_storage = False
-        self._users = {}
-        self._sessions = {}
+        # Pluggable storage: whole-file JSON (default), SQLite rows, or memory on read-only hosts
+        self._engine = open_engine(data_dir, backend)
+        self._open_stores()
+        # Recently verified tokens (TOKEN_CACHE_TTL seconds) so authenticated requests skip storage
+        self._token_cache = TokenCache()
+        # bcrypt on a bounded pool (BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS)
+        self._hasher = PasswordHasher()
         
-        # Create data directory if it doesn't exist
-        try:
-            os.makedirs(data_dir, exist_ok=True)
-        except PermissionError:
-            # In serverless environments, use in-memory storage
-            self._use_memory_storage = True
-            return
+        if isinstance(self._engine, JsonEngine):
+            # Sessions are append-only on the JSON backend: one line per login/logout
+            self.sessions_log = os.path.join(data_dir, "sessions.log")
+            self._sessions_store = SessionLog(self.sessions_log, legacy_json=self.sessions_file)
+            # Initialize files if they don't exist
+            self._init_files()
+        elif isinstance(self._engine, SqliteEngine):
+            self._import_legacy_json()
         
-        # Initialize files if they don't exist
-        self._init_files()
+        self._ensure_email_index()
+        self._ensure_submissions_partitioned()
+        self._ensure_user_histories()
+        self._ensure_score_calendars()
+        self._ensure_daily_stats()
+        self._ensure_streaks()
+        self._ensure_submission_index()
+        self._ensure_user_index()
+        self._ensure_metrics()
+    
+    def _open_stores(self):
+        """Bind every collection this service uses to the current engine."""
+        self._users_store = self._engine.collection("users")
+        self._sessions_store = self._engine.collection("sessions")
+        # Secondary index: email -> username
+        self._emails_store = self._engine.collection("user_emails")
+        # Small bookkeeping flags (one-time migrations)
+        self._meta_store = self._engine.collection("meta")
+        # Per-day leaderboard aggregates, maintained on submit
+        self._daily_stats_store = self._engine.collection("daily_stats")
+        # Cross-day boards (e.g. "streaks"), kept sorted on write
+        self._leaderboards_store = self._engine.collection("leaderboards")
+        # Every submission's admin row, in submit order (read newest-first)
+        self._submission_index = self._engine.log("submission_index")
+        # Usernames in registration order, for paging the admin user list newest-first
+        self._user_index = self._engine.log("user_index")
+        # Admin dashboard counters, updated on each event instead of recounted
+        self.metrics = MetricsRegistry(self._engine.collection("metrics"))
+    
+    @property
+    def _use_memory_storage(self) -> bool:
+        if self._engine.is_memory:
+            return True
+        return isinstance(self._users_store, JsonCollection) and self._users_store.is_memory
     
     def _init_files(self):
         """Initialize data files if they don't exist"""
         try:
             if not os.path.exists(self.users_file):
-                with open(self.users_file, 'w') as f:
-                    json.dump({}, f)
-            
-            if not os.path.exists(self.sessions_file):
-                with open(self.sessions_file, 'w') as f:
-                    json.dump({}, f)
+                atomic_write_json(self.users_file, {})
         except PermissionError:
             # Keep service alive even if mounted volume path is not writable.
-            self._use_memory_storage = True
+            self._engine = MemoryEngine()
+            self._open_stores()
+    
+    def _import_legacy_json(self):
+        """
+        First start on a fresh database: pull in existing users.json / sessions.json, once.
+        Later starts never re-import (an emptied collection would otherwise resurrect deleted
+        users or logged-out sessions); scripts/import_auth_data.py --force is the way to redo it.
+        """
+        try:
+            if self._meta_store.get("legacy_json_imported"):
+                return
+            n_users = import_json_collection(self._engine, "users", self.users_file)
+            n_sessions = import_json_collection(self._engine, "sessions", self.sessions_file)
+            self._meta_store.put("legacy_json_imported", datetime.now().isoformat())
+            if n_users or n_sessions:
+                print(f"AuthService - imported {n_users} users and {n_sessions} sessions from JSON")
+        except Exception as e:
+            print(f"AuthService - legacy JSON import failed: {e}")
     
     def _validate_password_rules(self, password: str) -> Optional[str]:
         """Standard manual-registration password rules. Returns error message or None if ok."""
@@ -62,98 +166,306 @@ class AuthService:
         return None
 
     def _hash_password(self, password: str) -> str:
-        """Hash password using SHA-256 with salt"""
-        salt = secrets.token_hex(16)
-        password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-        return f"{salt}:{password_hash}"
+        """Hash password with bcrypt (runs on the hasher pool)"""
+        return self._hasher.hash(password)
+    
+    @staticmethod
+    def _unusable_password_hash() -> str:
+        """
+        password_hash for accounts without a password (email-link, Google): matches neither
+        bcrypt nor salt:sha256, so no password verifies, and costs no hasher slot
+        """
+        return '!' + secrets.token_hex(16)
     
     def _verify_password(self, password: str, stored_hash: str) -> bool:
-        """Verify password against stored hash"""
-        try:
-            salt, password_hash = stored_hash.split(':')
-            test_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-            return test_hash == password_hash
-        except ValueError:
-            return False
+        """Verify password against a bcrypt or legacy salt:sha256 hash"""
+        return self._hasher.verify(password, stored_hash)
     
     def _load_users(self) -> Dict[str, Any]:
-        """Load users from file or memory"""
+        """Load all users (legacy whole-dict view; prefer _get_user for single lookups)"""
         print(f"🔍 AuthService - _load_users: using memory storage = {self._use_memory_storage}")
-        
-        if self._use_memory_storage:
-            print(f"🔍 AuthService - _load_users: returning memory users = {len(self._users)} users")
-            return self._users
-        
-        try:
-            print(f"🔍 AuthService - _load_users: trying to read file {self.users_file}")
-            with open(self.users_file, 'r') as f:
-                users = json.load(f)
-                print(f"🔍 AuthService - _load_users: loaded {len(users)} users from file")
-                return users
-        except (FileNotFoundError, json.JSONDecodeError, PermissionError) as e:
-            print(f"🔍 AuthService - _load_users: file error = {e}")
-            return {}
+        users = self._users_store.load_all()
+        print(f"🔍 AuthService - _load_users: loaded {len(users)} users")
+        return users
     
     def _save_users(self, users: Dict[str, Any]):
-        """Save users to file or memory"""
-        if self._use_memory_storage:
-            self._users = users
-            return
-        
-        try:
-            with open(self.users_file, 'w') as f:
-                json.dump(users, f, indent=2)
-        except PermissionError:
-            # Fallback to memory storage
-            self._use_memory_storage = True
-            self._users = users
+        """Replace all users (legacy whole-dict view)"""
+        self._users_store.save_all(users)
+        self._token_cache.clear()
+        self._rebuild_email_index()
     
     def _load_sessions(self) -> Dict[str, Any]:
-        """Load sessions from file or memory"""
-        if self._use_memory_storage:
-            return self._sessions
-        
-        try:
-            with open(self.sessions_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError, PermissionError):
-            return {}
+        """Load all sessions (legacy whole-dict view)"""
+        return self._sessions_store.load_all()
     
     def _save_sessions(self, sessions: Dict[str, Any]):
-        """Save sessions to file or memory"""
-        if self._use_memory_storage:
-            self._sessions = sessions
-            return
+        """Replace all sessions (legacy whole-dict view)"""
+        self._sessions_store.save_all(sessions)
+        self._token_cache.clear()
+    
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Read-cache hit/miss counters per collection (JSON backend only)."""
+        stats = self._engine.cache_stats()
+        if isinstance(self._sessions_store, SessionLog):
+            stats['sessions'] = self._sessions_store.cache_stats()
+        stats['tokens'] = self._token_cache.stats()
+        return stats
+    
+    def _get_user(self, username: str) -> Optional[Dict[str, Any]]:
+        """Load a single user record (shared with the read cache; do not mutate)"""
+        if not username:
+            return None
+        return self._users_store.get(username)
+    
+    def _insert_user(self, username: str, user_data: Dict[str, Any], claim_email: bool = True) -> bool:
+        """
+        Store a new user record; False if the username is already taken.
+        Pass claim_email=False when the caller has already claimed the email (register_user).
+        """
+        def _insert(current):
+            if current is not None:
+                return None, False
+            return user_data, True
         
+        if not self._users_store.update(username, _insert):
+            return False
+        if claim_email:
+            self._claim_email(user_data.get('email'), username)
+        self._user_index.append({'username': username, 'created_at': user_data.get('created_at')})
+        self.metrics.incr("users")
+        return True
+    
+    def _ensure_submissions_partitioned(self):
+        """One-time move of embedded submission_history into day partitions."""
         try:
-            with open(self.sessions_file, 'w') as f:
-                json.dump(sessions, f, indent=2)
-        except PermissionError:
-            # Fallback to memory storage
-            self._use_memory_storage = True
-            self._sessions = sessions
+            if self._meta_store.get("submissions_partitioned"):
+                return
+            moved = self.migrate_submission_history()
+            self._meta_store.put("submissions_partitioned", datetime.now().isoformat())
+            if moved:
+                print(f"AuthService - moved {moved} submissions into day partitions")
+        except Exception as e:
+            print(f"AuthService - submission partition migration failed: {e}")
+    
+    def _ensure_user_histories(self):
+        """One-time backfill of the per-user history logs from day partitions."""
+        try:
+            if self._meta_store.get("user_histories_built"):
+                return
+            users = self.rebuild_user_histories()
+            self._meta_store.put("user_histories_built", datetime.now().isoformat())
+            if users:
+                print(f"AuthService - built submission histories for {users} users")
+        except Exception as e:
+            print(f"AuthService - submission history backfill failed: {e}")
+    
+    def _ensure_score_calendars(self):
+        """One-time conversion of legacy daily_scores dicts into score calendars."""
+        try:
+            if self._meta_store.get("score_calendars_built"):
+                return
+            users = self.migrate_score_calendars()
+            self._meta_store.put("score_calendars_built", datetime.now().isoformat())
+            if users:
+                print(f"AuthService - converted daily scores for {users} users")
+        except Exception as e:
+            print(f"AuthService - score calendar conversion failed: {e}")
+    
+    def migrate_score_calendars(self) -> int:
+        """Replace every record's daily_scores dict with its score calendar; returns users converted."""
+        converted = 0
+        for username in self._users_store.keys():
+            def _convert(current):
+                if current is None or 'daily_scores' not in current:
+                    return None, False
+                current['score_calendar'] = self._calendar_of(current).to_record()
+                del current['daily_scores']
+                return current, True
+            
+            if self._users_store.update(username, _convert):
+                converted += 1
+        return converted
+    
+    def rebuild_user_histories(self) -> int:
+        """Rewrite every user's history log from the day partitions; returns users with history."""
+        histories: Dict[str, List[Dict[str, Any]]] = {}
+        for date_str in self._submission_dates():
+            for username, sub in self._submissions_on(date_str).items():
+                if isinstance(sub, dict):
+                    histories.setdefault(username, []).append(dict(sub, date=date_str))
+        for username, submissions in histories.items():
+            self._history_of(username).replace(submissions)
+        return len(histories)
+    
+    # Bump when daily_stats docs gain fields that need a backfill (2: score histogram)
+    _DAILY_STATS_FORMAT = 2
+    
+    def _ensure_daily_stats(self):
+        """One-time backfill of per-day leaderboard aggregates from existing scores."""
+        try:
+            if (self._meta_store.get("daily_stats_format") or 0) >= self._DAILY_STATS_FORMAT:
+                return
+            days = self.rebuild_daily_stats()
+            self._meta_store.put("daily_stats_format", self._DAILY_STATS_FORMAT)
+            if days:
+                print(f"AuthService - built leaderboard stats for {days} days")
+        except Exception as e:
+            print(f"AuthService - daily stats backfill failed: {e}")
+    
+    # Bump when the streak board layout changes (2: bounded per-day current boards)
+    _STREAK_BOARD_FORMAT = 2
+    
+    def _ensure_streaks(self):
+        """One-time backfill of stored streaks and the streak boards."""
+        try:
+            if (self._meta_store.get("streak_board_format") or 0) >= self._STREAK_BOARD_FORMAT:
+                return
+            users = self.rebuild_streaks()
+            self._meta_store.put("streak_board_format", self._STREAK_BOARD_FORMAT)
+            if users:
+                print(f"AuthService - built streaks for {users} users")
+        except Exception as e:
+            print(f"AuthService - streak backfill failed: {e}")
+    
+    def _ensure_submission_index(self):
+        """One-time backfill of the append-ordered submission index from day partitions."""
+        try:
+            if self._meta_store.get("submission_index_built"):
+                return
+            rows = self.rebuild_submission_index()
+            self._meta_store.put("submission_index_built", datetime.now().isoformat())
+            if rows:
+                print(f"AuthService - indexed {rows} submissions")
+        except Exception as e:
+            print(f"AuthService - submission index backfill failed: {e}")
+    
+    def _ensure_user_index(self):
+        """One-time backfill of the registration-ordered user index."""
+        try:
+            if self._meta_store.get("user_index_built"):
+                return
+            users = self.rebuild_user_index()
+            self._meta_store.put("user_index_built", datetime.now().isoformat())
+            if users:
+                print(f"AuthService - indexed {users} users")
+        except Exception as e:
+            print(f"AuthService - user index backfill failed: {e}")
+    
+    def _ensure_email_index(self):
+        """
+        One-time build of the email index; claims and releases keep it current afterwards.
+        (Counts cannot tell drift: accounts without an email never have an index entry.)
+        """
+        try:
+            if self._meta_store.get("email_index_built"):
+                return
+            self._rebuild_email_index()
+            self._meta_store.put("email_index_built", datetime.now().isoformat())
+        except Exception as e:
+            print(f"AuthService - email index backfill failed: {e}")
+    
+    def _rebuild_email_index(self):
+        """Recompute email -> username from every user record (first account per email wins)."""
+        index: Dict[str, str] = {}
+        for username, user_data in self._users_store.items():
+            email = user_data.get('email') if isinstance(user_data, dict) else None
+            if email:
+                index.setdefault(email, username)
+        self._emails_store.save_all(index)
+    
+    def _claim_email(self, email: Optional[str], username: str) -> bool:
+        """Point email at username unless another live account already owns it."""
+        if not email:
+            return True
+        
+        def _claim(owner):
+            if owner is not None and owner != username:
+                owner_data = self._users_store.get(owner)
+                if owner_data is not None and owner_data.get('email') == email:
+                    return None, False
+            if owner == username:
+                return None, True
+            return username, True
+        
+        return self._emails_store.update(email, _claim)
+    
+    def _release_email(self, email: Optional[str], username: str):
+        if email and self._emails_store.get(email) == username:
+            self._emails_store.delete(email)
+    
+    def find_user_by_email(self, email: Optional[str]) -> Optional[str]:
+        """Username of the account registered with this email, or None."""
+        if not email:
+            return None
+        username = self._emails_store.get(email)
+        if username is None:
+            return None
+        user_data = self._get_user(username)
+        if user_data is None or user_data.get('email') != email:
+            return None
+        return username
+    
+    def create_session(self, username: str, ttl: timedelta = timedelta(days=7), **extra: Any) -> str:
+        """Create a session token for username (or a pending Google setup when username is None)"""
+        session_token = secrets.token_urlsafe(32)
+        session_data: Dict[str, Any] = {}
+        if username is not None:
+            session_data['username'] = username
+        session_data.update(extra)
+        session_data['created_at'] = datetime.now().isoformat()
+        session_data['expires_at'] = (datetime.now() + ttl).isoformat()
+        self._sessions_store.put(session_token, session_data)
+        if username is not None:
+            self.metrics.incr(self._session_bucket(session_data['expires_at']))
+        return session_token
+    
+    def _submissions_on(self, day: str):
+        """Partition holding every detailed submission for one calendar day, keyed by username."""
+        return self._engine.collection(f"submissions/{day}")
+    
+    def _submission_dates(self) -> List[str]:
+        """Calendar days that have a submissions partition, oldest first."""
+        return [name.split('/', 1)[1] for name in self._engine.collection_names("submissions/")]
+    
+    def _history_of(self, username: str):
+        """
+        One user's detailed submissions in submit order, so reading a history costs that
+        user's poems only, not every player's poems for each day they played.
+        """
+        return self._engine.log(history_log_name(username))
+    
+    def _get_submission(self, username: str, user_data: Dict[str, Any], day: str) -> Optional[Dict[str, Any]]:
+        """Detailed submission for one day: partition first, then any not-yet-migrated embedded history."""
+        submission = self._submissions_on(day).get(username)
+        if submission is None:
+            submission = (user_data.get('submission_history') or {}).get(day)
+        return submission if isinstance(submission, dict) else None
+    
+    def migrate_submission_history(self) -> int:
+        """
+        Move embedded submission_history out of every user record into day partitions.
+        Idempotent; returns how many submissions were moved.
+        """
+        return partition_submission_history(self._engine)
     
     def register_user(self, username: str, email: str, password: str) -> Dict[str, Any]:
         """Register a new user"""
         print(f"🔍 AuthService - Registering user: {username}")
         print(f"🔍 AuthService - Using memory storage: {self._use_memory_storage}")
         
-        users = self._load_users()
-        
         # Check if username already exists
-        if username in users:
+        if self._users_store.contains(username):
             return {
                 'success': False,
                 'message': 'Username already exists'
             }
         
         # Check if email already exists
-        for user_data in users.values():
-            if user_data.get('email') == email:
-                return {
-                    'success': False,
-                    'message': 'Email already registered'
-                }
+        if self.find_user_by_email(email) is not None:
+            return {
+                'success': False,
+                'message': 'Email already registered'
+            }
         
         # Validate input
         if len(username) < 3:
@@ -166,23 +478,37 @@ class AuthService:
         if pwd_err:
             return {'success': False, 'message': pwd_err}
         
+        try:
+            password_hash = self._hash_password(password)
+        except PasswordHasherBusy:
+            return {'success': False, 'message': self._BUSY_MESSAGE}
+        
         # Create new user
         user_data = {
             'username': username,
             'email': email,
-            'password_hash': self._hash_password(password),
+            'password_hash': password_hash,
             'created_at': datetime.now().isoformat(),
             'last_login': None,
             'games_played': 0,
             'total_score': 0,
             'best_score': 0,
-            'daily_scores': {},  # Format: {'YYYY-MM-DD': {'score': int, 'submitted': bool}}
-            'submission_history': {},  # Detailed submission data
+            'score_calendar': ScoreCalendar().to_record(),  # One byte per day; see ScoreCalendar
+            'submission_count': 0,  # Detailed submissions live in submissions/<date> partitions
             'last_daily_submission': None
         }
         
-        users[username] = user_data
-        self._save_users(users)
+        if not self._claim_email(email, username):
+            return {
+                'success': False,
+                'message': 'Email already registered'
+            }
+        if not self._insert_user(username, user_data, claim_email=False):
+            self._release_email(email, username)
+            return {
+                'success': False,
+                'message': 'Username already exists'
+            }
         
         return {
             'success': True,
@@ -194,39 +520,43 @@ class AuthService:
             }
         }
     
+    _BUSY_MESSAGE = 'Too many sign-ins right now, please try again in a moment'
+    
     def login_user(self, username: str, password: str) -> Dict[str, Any]:
         """Login a user and create session"""
-        users = self._load_users()
+        user_data = self._get_user(username)
         
-        if username not in users:
+        if user_data is None:
             return {
                 'success': False,
                 'message': 'Invalid username or password'
             }
         
-        user_data = users[username]
-        
-        if not self._verify_password(password, user_data['password_hash']):
-            return {
-                'success': False,
-                'message': 'Invalid username or password'
-            }
+        old_hash = user_data['password_hash']
+        try:
+            if not self._verify_password(password, old_hash):
+                return {
+                    'success': False,
+                    'message': 'Invalid username or password'
+                }
+            # Upgrade legacy SHA-256 (or lower-cost bcrypt) hashes while we hold the plaintext
+            new_hash = self._hash_password(password) if self._hasher.needs_rehash(old_hash) else None
+        except PasswordHasherBusy:
+            return {'success': False, 'message': self._BUSY_MESSAGE}
         
         # Update last login
-        user_data['last_login'] = datetime.now().isoformat()
-        users[username] = user_data
-        self._save_users(users)
+        def _touch(current):
+            if current is None:
+                return None, None
+            current['last_login'] = datetime.now().isoformat()
+            if new_hash and current.get('password_hash') == old_hash:
+                current['password_hash'] = new_hash
+            return current, current
         
-        # Create session
-        session_token = secrets.token_urlsafe(32)
-        sessions = self._load_sessions()
+        user_data = self._users_store.update(username, _touch) or user_data
         
-        sessions[session_token] = {
-            'username': username,
-            'created_at': datetime.now().isoformat(),
-            'expires_at': (datetime.now() + timedelta(days=7)).isoformat()
-        }
-        self._save_sessions(sessions)
+        # Create session
+        session_token = self.create_session(username)
         
         return {
             'success': True,
@@ -248,40 +578,40 @@ class AuthService:
             print(f"🔍 AuthService - No token provided")
             return None
             
-        sessions = self._load_sessions()
+        cached = self._token_cache.get(token)
+        if cached is not None:
+            return cached
+        
         print(f"🔍 AuthService - Token: {token[:20]}...")
-        print(f"🔍 AuthService - Sessions keys: {list(sessions.keys())[:3]}...")
+        session_data = self._sessions_store.get(token)
         
-        if token not in sessions:
+        if session_data is None:
             print(f"🔍 AuthService - Token not found in sessions")
             return None
         
-        session_data = sessions[token]
         # Pending Google username setup — not a full login session for /api/auth/verify
         if session_data.get("google_user"):
             return None
         expires_at = datetime.fromisoformat(session_data['expires_at'])
+        now = datetime.now()
         
-        if datetime.now() > expires_at:
+        if now > expires_at:
             # Token expired, remove it
-            del sessions[token]
-            self._save_sessions(sessions)
+            self._sessions_store.delete(token)
             return None
         
         # Get user data
-        users = self._load_users()
         username = session_data.get('username')
         if not username:
             return None
         
-        if username not in users:
+        user_data = self._get_user(username)
+        if user_data is None:
             # User no longer exists, remove session
-            del sessions[token]
-            self._save_sessions(sessions)
+            self._sessions_store.delete(token)
             return None
         
-        user_data = users[username]
-        return {
+        summary = {
             'username': username,
             'email': user_data['email'],
             'created_at': user_data['created_at'],
@@ -289,55 +619,54 @@ class AuthService:
             'total_score': user_data['total_score'],
             'best_score': user_data['best_score']
         }
+        self._token_cache.put(token, summary, (expires_at - now).total_seconds())
+        return summary
     
     def logout_user(self, token: str) -> bool:
         """Logout user by removing session token"""
-        sessions = self._load_sessions()
-        
-        if token in sessions:
-            del sessions[token]
-            self._save_sessions(sessions)
-            return True
-        
-        return False
+        if not token:
+            return False
+        self._token_cache.invalidate_token(token)
+        session_data = self._sessions_store.get(token)
+        if not self._sessions_store.delete(token):
+            return False
+        if session_data and not session_data.get('google_user') and session_data.get('expires_at'):
+            self.metrics.decr(self._session_bucket(session_data['expires_at']))
+        return True
     
     def update_user_stats(self, username: str, score: int) -> bool:
         """Update user statistics after a game"""
-        users = self._load_users()
-        
-        if username not in users:
-            return False
-        
-        user_data = users[username]
-        user_data['games_played'] += 1
-        user_data['total_score'] += score
-        
-        if score > user_data['best_score']:
-            user_data['best_score'] = score
+        def _apply(user_data):
+            if user_data is None:
+                return None, False
+            user_data['games_played'] += 1
+            user_data['total_score'] += score
+            
+            if score > user_data['best_score']:
+                user_data['best_score'] = score
+            return user_data, True
         
-        users[username] = user_data
-        self._save_users(users)
-        return True
+        updated = self._users_store.update(username, _apply)
+        if updated:
+            self._token_cache.invalidate_user(username)
+        return updated
     
     def get_daily_submission_status(self, username: str, calendar_date: str) -> Dict[str, Any]:
         """Check if user has already submitted for this calendar day (client local YYYY-MM-DD)."""
-        users = self._load_users()
+        user_data = self._get_user(username)
         
-        if username not in users:
+        if user_data is None:
             return {'can_submit': False, 'message': 'User not found'}
         
-        user_data = users[username]
         day = calendar_date.strip()
         
-        ds = (user_data.get('daily_scores') or {}).get(day)
-        if isinstance(ds, dict) and ds.get('submitted'):
-            history = user_data.get('submission_history', {}) or {}
-            submission = history.get(day)
+        existing = self._calendar_of(user_data).get(day)
+        if existing is not None:
             return {
                 'can_submit': False,
                 'message': 'You have already submitted today\'s daily challenge',
-                'daily_score': ds.get('score', 0),
-                'submission': submission if isinstance(submission, dict) else None,
+                'daily_score': existing,
+                'submission': self._get_submission(username, user_data, day),
             }
         
         return {'can_submit': True, 'message': 'Ready to submit'}
@@ -350,37 +679,64 @@ class AuthService:
         calendar_date: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Submit daily score for calendar_date (YYYY-MM-DD); defaults to UTC day if omitted."""
-        users = self._load_users()
-        
-        if username not in users:
-            return {'success': False, 'message': 'User not found'}
-        
-        user_data = users[username]
         today = (calendar_date or datetime.utcnow().strftime('%Y-%m-%d')).strip()
+        streak_last_date: List[Optional[str]] = [None]
         
-        ds_existing = (user_data.get('daily_scores') or {}).get(today)
-        if isinstance(ds_existing, dict) and ds_existing.get('submitted'):
-            return {
-                'success': False, 
-                'message': 'You have already submitted today\'s daily challenge',
-                'daily_score': ds_existing.get('score', 0)
+        def _apply(user_data):
+            if user_data is None:
+                return None, {'success': False, 'message': 'User not found'}
+            
+            calendar = self._calendar_of(user_data)
+            existing = calendar.get(today)
+            if existing is not None:
+                return None, {
+                    'success': False, 
+                    'message': 'You have already submitted today\'s daily challenge',
+                    'daily_score': existing
+                }
+            
+            if submission_data:
+                user_data['submission_count'] = user_data.get('submission_count', 0) + 1
+            
+            # Update last daily submission
+            user_data['last_daily_submission'] = today
+            calendar.set(today, score)
+            user_data['score_calendar'] = calendar.to_record()
+            # The calendar supersedes the per-day dict of older records
+            user_data.pop('daily_scores', None)
+            self._advance_streak(user_data, today)
+            streak_last_date[0] = user_data['streak_last_date']
+            
+            # Update overall stats
+            user_data['games_played'] += 1
+            user_data['total_score'] += score
+            
+            if score > user_data['best_score']:
+                user_data['best_score'] = score
+            
+            return user_data, {
+                'success': True, 
+                'message': 'Daily score submitted successfully',
+                'daily_score': score,
+                'total_score': user_data['total_score'],
+                'best_score': user_data['best_score'],
+                'current_streak': user_data['current_streak'],
+                'longest_streak': user_data['longest_streak']
             }
         
-        # Initialize data structures if they don't exist
-        if 'daily_scores' not in user_data:
-            user_data['daily_scores'] = {}
-        if 'submission_history' not in user_data:
-            user_data['submission_history'] = {}
-        
-        # Update daily score (simple format for backward compatibility)
-        user_data['daily_scores'][today] = {
-            'score': score,
-            'submitted': True
-        }
+        result = self._users_store.update(username, _apply)
+        if result.get('success'):
+            # Cached verify_token summaries carry games_played / scores
+            self._token_cache.invalidate_user(username)
+            stats = self._record_daily_stats(today, username, score)
+            ranking = self._rank_in_histogram(stats["histogram"], score)
+            result['rank'] = ranking['rank']
+            result['percentile'] = ranking['percentile']
+            self._record_streak(username, result['current_streak'], result['longest_streak'], streak_last_date[0])
         
-        # Store detailed submission data
-        if submission_data:
-            user_data['submission_history'][today] = {
+        # Store detailed submission data in the day's partition, outside the hot user record
+        if result.get('success') and submission_data:
+            submission = {
                 'date': today,
                 'score': score,
                 'mode': submission_data.get('mode', 'hard'),  # 'easy' or 'hard'
@@ -398,125 +754,369 @@ class AuthService:
                 'ai_feedback': submission_data.get('ai_feedback', ''),
                 'submitted_at': datetime.now().isoformat()
             }
+            self._submissions_on(today).put(username, submission)
+            self._history_of(username).append(submission)
+            self.metrics.incr("submissions")
+            self._submission_index.append(self._admin_submission_row(username, today, submission))
         
-        # Update last daily submission
-        user_data['last_daily_submission'] = today
-        
-        # Update overall stats
-        user_data['games_played'] += 1
-        user_data['total_score'] += score
-        
-        if score > user_data['best_score']:
-            user_data['best_score'] = score
+        return result
+    
+    def get_score_calendar(self, username: str, year: int) -> Dict[str, Any]:
+        """One score (or None) per day of `year`, for the profile heatmap."""
+        user_data = self._get_user(username)
+        if user_data is None:
+            return {'success': False, 'message': 'User not found'}
         
-        users[username] = user_data
-        self._save_users(users)
+        calendar = self._calendar_of(user_data)
+        if 'score_calendar' not in user_data:
+            # Convert older records once; later submissions keep the vector current
+            def _store_calendar(current):
+                if current is None or 'score_calendar' in current:
+                    return None, None
+                current['score_calendar'] = calendar.to_record()
+                current.pop('daily_scores', None)
+                return current, None
+            
+            self._users_store.update(username, _store_calendar)
         
+        scores = calendar.year(year)
+        submitted = [s for s in scores if s is not None]
         return {
-            'success': True, 
-            'message': 'Daily score submitted successfully',
-            'daily_score': score,
-            'total_score': user_data['total_score'],
-            'best_score': user_data['best_score']
+            'success': True,
+            'year': year,
+            'start_date': f"{year:04d}-01-01",
+            'scores': scores,
+            'days_submitted': len(submitted),
+            'best_score': max(submitted, default=0),
+            'average_score': round(sum(submitted) / len(submitted), 1) if submitted else 0
         }
     
-    def get_daily_score_history(self, username: str) -> Dict[str, Any]:
+    def get_daily_score_history(self, username: str, calendar_date: Optional[str] = None) -> Dict[str, Any]:
         """Get user's daily score history"""
-        users = self._load_users()
+        user_data = self._get_user(username)
         
-        if username not in users:
+        if user_data is None:
             return {'success': False, 'message': 'User not found'}
         
-        user_data = users[username]
-        daily_scores = user_data.get('daily_scores', {})
+        calendar = self._calendar_of(user_data)
+        if 'streak_last_date' in user_data:
+            current, longest, last = (
+                user_data['current_streak'], user_data['longest_streak'], user_data['streak_last_date']
+            )
+        else:
+            current, longest, last = self._calendar_of(user_data).streaks()
         
         return {
             'success': True,
-            'daily_scores': daily_scores,
-            'current_streak': self._calculate_streak(daily_scores),
-            'best_daily_score': max([data['score'] for data in daily_scores.values()], default=0)
+            # Legacy response shape, built from the calendar on demand
+            'daily_scores': {day: {'score': score, 'submitted': True} for day, score in calendar.days()},
+            'current_streak': self._live_streak(current, last, calendar_date),
+            'longest_streak': longest,
+            'best_daily_score': calendar.best()
         }
     
-    def _calculate_streak(self, daily_scores: Dict[str, Dict]) -> int:
-        """Calculate current submission streak"""
-        if not daily_scores:
+    @staticmethod
+    def _calendar_of(user_data: Dict[str, Any]) -> ScoreCalendar:
+        """The user's score vector; built from daily_scores for records that predate it."""
+        record = user_data.get('score_calendar')
+        if isinstance(record, dict):
+            return ScoreCalendar.from_record(record)
+        return ScoreCalendar.from_daily_scores(user_data.get('daily_scores') or {})
+    
+    def _advance_streak(self, user_data: Dict[str, Any], day: str):
+        """O(1) streak update for a submission on `day`; recounts only for out-of-order days."""
+        last = user_data.get('streak_last_date')
+        try:
+            gap = (date.fromisoformat(day) - date.fromisoformat(last)).days if last else None
+        except ValueError:
+            gap = None
+        if gap is not None and gap > 0 and 'current_streak' in user_data:
+            current = user_data['current_streak'] + 1 if gap == 1 else 1
+            user_data['current_streak'] = current
+            user_data['longest_streak'] = max(user_data.get('longest_streak', 0), current)
+            user_data['streak_last_date'] = day
+            return
+        current, longest, last = self._calendar_of(user_data).streaks()
+        user_data['current_streak'] = current
+        user_data['longest_streak'] = longest
+        user_data['streak_last_date'] = last
+    
+    @staticmethod
+    def _live_streak(current: int, last_date: Optional[str], today: Optional[str] = None) -> int:
+        """A streak stays alive through the day after its last submission."""
+        if not last_date:
             return 0
+        today = today or datetime.now().strftime('%Y-%m-%d')
+        try:
+            cutoff = (date.fromisoformat(today) - timedelta(days=1)).isoformat()
+        except ValueError:
+            return current
+        return current if last_date >= cutoff else 0
+    
+    @staticmethod
+    def _streak_sort_key(entry: List[Any]):
+        return (-entry[0], entry[-1].lower())
+    
+    @staticmethod
+    def _place_on_board(entries: List[List[Any]], entry: List[Any]) -> Optional[List[List[Any]]]:
+        """
+        `entries` with `entry` (username last) in its sorted place, cut to STREAK_BOARD_SIZE;
+        None when the board would not change (full, and `entry` is below its cutoff)
+        """
+        size = int(os.getenv("STREAK_BOARD_SIZE", "100"))
+        key = AuthService._streak_sort_key
+        kept = [e for e in entries if e[-1] != entry[-1]]
+        if len(kept) == len(entries) and len(kept) >= size and key(entry) >= key(kept[size - 1]):
+            return None
+        bisect.insort(kept, entry, key=key)
+        return kept[:size]
+    
+    @staticmethod
+    def _streak_day_key(day: str) -> str:
+        """Current-streak board for players whose streak last advanced on `day`"""
+        return f"streaks:{day}"
+    
+    def _record_on_board(self, key: str, field: str, entry: List[Any]) -> bool:
+        """Place `entry` on the board doc at `key`; boards it cannot enter are not written."""
+        board = self._leaderboards_store.get(key) or {}
+        if self._place_on_board(board.get(field, []), entry) is None:
+            return False
         
-        # Sort dates in descending order
-        sorted_dates = sorted(daily_scores.keys(), reverse=True)
-        streak = 0
-        current_date = datetime.now()
+        def _apply(board):
+            board = board or {field: [], 'version': 0}
+            placed = self._place_on_board(board.get(field, []), entry)
+            if placed is None:
+                return None, False
+            board[field] = placed
+            board['version'] = board.get('version', 0) + 1
+            return board, True
         
-        for date_str in sorted_dates:
-            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-            days_diff = (current_date - date_obj).days
+        return self._leaderboards_store.update(key, _apply)
+    
+    def _prune_streak_days(self, day: str):
+        """Drop current-streak boards two or more days older than `day`; no streak there is live."""
+        try:
+            oldest = self._streak_day_key((date.fromisoformat(day) - timedelta(days=2)).isoformat())
+        except ValueError:
+            return
+        stale = [k for k in self._leaderboards_store.keys() if k.startswith("streaks:") and k < oldest]
+        if stale:
+            self._leaderboards_store.delete_many(stale)
+    
+    def _record_streak(self, username: str, current: int, longest: int, last_date: Optional[str]):
+        """
+        O(STREAK_BOARD_SIZE) per submit: each board holds at most that many entries and is only
+        rewritten when the player makes its cut, so most submissions write no board at all.
+        """
+        if not last_date:
+            return
+        day_key = self._streak_day_key(last_date)
+        is_new_day = not self._leaderboards_store.contains(day_key)
+        self._record_on_board(day_key, 'current', [current, last_date, username])
+        self._record_on_board("streaks", 'longest', [longest, username])
+        if is_new_day:
+            self._prune_streak_days(last_date)
+    
+    def rebuild_streaks(self) -> int:
+        """Recompute every user's stored streaks and the streak boards; returns users with a streak."""
+        entries = []
+        for username, u in self._users_store.items():
+            def _apply(current):
+                if current is None:
+                    return None, None
+                streak = self._calendar_of(current).streaks()
+                stored = (current.get('current_streak'), current.get('longest_streak'), current.get('streak_last_date'))
+                if stored == streak:
+                    return None, streak
+                current['current_streak'], current['longest_streak'], current['streak_last_date'] = streak
+                return current, streak
             
-            # If it's today or consecutive days, count it
-            if days_diff == streak:
-                streak += 1
-                current_date = date_obj
-            else:
-                break
+            streak = self._users_store.update(username, _apply)
+            if streak and streak[2]:
+                entries.append((username, streak))
         
-        return streak
+        # Only the most recent days can hold a live streak (see _prune_streak_days)
+        recent = sorted({last for _, (_, _, last) in entries}, reverse=True)[:3]
+        boards: Dict[str, List[List[Any]]] = {}
+        longest_board: List[List[Any]] = []
+        for username, (current, longest, last) in entries:
+            if last in recent:
+                key = self._streak_day_key(last)
+                boards[key] = self._place_on_board(boards.get(key, []), [current, last, username]) or boards.get(key, [])
+            longest_board = self._place_on_board(longest_board, [longest, username]) or longest_board
+        
+        stale = [k for k in self._leaderboards_store.keys() if k.startswith("streaks:") and k not in boards]
+        if stale:
+            self._leaderboards_store.delete_many(stale)
+        previous = self._leaderboards_store.get("streaks") or {}
+        self._leaderboards_store.put("streaks", {'longest': longest_board, 'version': previous.get('version', 0) + 1})
+        for key, board in boards.items():
+            previous = self._leaderboards_store.get(key) or {}
+            self._leaderboards_store.put(key, {'current': board, 'version': previous.get('version', 0) + 1})
+        return len(entries)
+    
+    def get_streak_leaderboard(self, limit: int = 10, kind: str = "current", today: Optional[str] = None) -> Dict[str, Any]:
+        """Top-N live current streaks (or all-time longest) from the pre-sorted boards."""
+        streaks: List[Dict[str, Any]] = []
+        if kind == "longest":
+            board = self._leaderboards_store.get("streaks") or {}
+            for streak, username in board.get('longest', [])[:limit]:
+                streaks.append({'username': username, 'streak': streak})
+            return {'success': True, 'kind': kind, 'streaks': streaks}
+        
+        today = today or datetime.now().strftime('%Y-%m-%d')
+        try:
+            yesterday = (date.fromisoformat(today) - timedelta(days=1)).isoformat()
+        except ValueError:
+            return {'success': True, 'kind': kind, 'streaks': streaks}
+        # A streak is live through the day after its last submission. Today's board goes first so
+        # a player's newest entry wins; a stale one from yesterday can only rank below today's cut.
+        latest: Dict[str, List[Any]] = {}
+        for day in (today, yesterday):
+            for entry in (self._leaderboards_store.get(self._streak_day_key(day)) or {}).get('current', []):
+                latest.setdefault(entry[2], entry)
+        for streak, last_date, username in sorted(latest.values(), key=self._streak_sort_key)[:limit]:
+            streaks.append({'username': username, 'streak': streak, 'last_date': last_date})
+        return {'success': True, 'kind': kind, 'streaks': streaks}
+    
+    @staticmethod
+    def _detailed_submission_count(user_data: Dict[str, Any]) -> int:
+        """Detailed submissions (poems) stored for a user: partitioned ones plus any still embedded."""
+        return user_data.get('submission_count', 0) + len(user_data.get('submission_history') or {})
     
     def get_submission_history(self, username: str) -> Dict[str, Any]:
         """Get user's detailed submission history"""
-        users = self._load_users()
+        user_data = self._get_user(username)
         
-        if username not in users:
+        if user_data is None:
             return {'success': False, 'message': 'User not found'}
         
-        user_data = users[username]
-        submission_history = user_data.get('submission_history', {})
-        
-        # Sort by date (most recent first)
-        sorted_submissions = dict(sorted(
-            submission_history.items(), 
-            key=lambda x: x[0], 
-            reverse=True
-        ))
+        # The user's own history log, newest first; any not-yet-migrated embedded entries fill gaps
+        submissions: Dict[str, Dict[str, Any]] = {}
+        history, position = self._history_of(username), None
+        while True:
+            page, position = history.scan_reverse(position, 500)
+            for submission in page:
+                if isinstance(submission, dict) and submission.get('date'):
+                    submissions.setdefault(submission['date'], submission)
+            if position is None:
+                break
+        for day, submission in (user_data.get('submission_history') or {}).items():
+            if isinstance(submission, dict):
+                submissions.setdefault(day, submission)
+        sorted_submissions = {day: submissions[day] for day in sorted(submissions, reverse=True)}
         
         return {
             'success': True,
             'submissions': sorted_submissions,
-            'total_submissions': len(submission_history)
+            'total_submissions': self._detailed_submission_count(user_data)
+        }
+    
+    def get_submission_history_page(self, username: str, limit: int, before: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Newest-first page of detailed submissions from the user's history log; `before` is the
+        log position a previous page returned as next_before. Raises ValueError on a bad position.
+        """
+        user_data = self._get_user(username)
+        
+        if user_data is None:
+            return {'success': False, 'message': 'User not found'}
+        
+        total = self._detailed_submission_count(user_data)
+        entries, next_before = self._history_of(username).scan_reverse(self._log_position(before), limit)
+        page: Dict[str, Dict[str, Any]] = {}
+        for submission in entries:
+            # Entries run newest-first; keep the newest for a date, as get_submission_history does
+            if isinstance(submission, dict) and submission.get('date'):
+                page.setdefault(submission['date'], submission)
+        
+        return {
+            'success': True,
+            'submissions': page,
+            'total_submissions': total,
+            'next_before': next_before
         }
 
-    def _user_daily_score_on_date(self, user_data: Dict[str, Any], day: str) -> Optional[int]:
-        """Score for a calendar day if the user submitted the daily that day."""
-        hist = user_data.get("submission_history") or {}
-        if day in hist and isinstance(hist[day], dict):
-            s = hist[day].get("score")
-            if s is not None:
-                try:
-                    return int(s)
-                except (TypeError, ValueError):
-                    pass
-        ds = (user_data.get("daily_scores") or {}).get(day)
-        if isinstance(ds, dict) and ds.get("submitted"):
-            s = ds.get("score")
-            if s is not None:
+    def _user_daily_scores(self, user_data: Dict[str, Any]) -> Dict[str, int]:
+        """Score per calendar day the user submitted the daily (calendar, then any embedded history)."""
+        scores = dict(self._calendar_of(user_data).days())
+        for day, entry in (user_data.get("submission_history") or {}).items():
+            if isinstance(entry, dict) and day not in scores and entry.get("score") is not None:
                 try:
-                    return int(s)
+                    scores[day] = int(entry["score"])
                 except (TypeError, ValueError):
                     pass
-        return None
+        return scores
+
+    @staticmethod
+    def _add_to_daily_stats(stats: Optional[Dict[str, Any]], day: str, username: str, score: int) -> Dict[str, Any]:
+        """Fold one submission into a day's aggregate: top score, tied leaders, count, histogram."""
+        if stats is None:
+            stats = {"date": day, "top_score": None, "leaders": [], "submission_count": 0, "version": 0}
+        if "histogram" not in stats:
+            stats["histogram"] = [0] * 101  # submissions per score 0..100
+        stats["submission_count"] += 1
+        stats["histogram"][max(0, min(score, 100))] += 1
+        top = stats["top_score"]
+        if top is None or score > top:
+            stats["top_score"] = score
+            stats["leaders"] = [username]
+        elif score == top and username not in stats["leaders"]:
+            stats["leaders"].append(username)
+            stats["leaders"].sort(key=str.lower)
+        stats["version"] = stats.get("version", 0) + 1
+        return stats
+
+    def _record_daily_stats(self, day: str, username: str, score: int) -> Dict[str, Any]:
+        """Apply one submission to the day's aggregate; returns the updated aggregate."""
+        def _apply(stats):
+            stats = self._add_to_daily_stats(stats, day, username, score)
+            return stats, stats
+        
+        return self._daily_stats_store.update(day, _apply)
+
+    @staticmethod
+    def _rank_in_histogram(histogram: List[int], score: int) -> Dict[str, Any]:
+        """Rank (1 = best, ties share) and percentile (share of scores at or below) in 101 steps."""
+        score = max(0, min(score, 100))
+        total = sum(histogram)
+        above = sum(histogram[score + 1:])
+        at_or_below = total - above
+        return {
+            "rank": above + 1,
+            "total": total,
+            "percentile": round(100.0 * at_or_below / total, 1) if total else None,
+        }
+
+    def get_daily_percentile(self, score: int, target_date: Optional[str] = None) -> Dict[str, Any]:
+        """Where `score` would place among the day's submissions (no user scan)."""
+        day = (target_date or datetime.now().strftime("%Y-%m-%d")).strip()
+        stats = self._daily_stats_store.get(day) or {}
+        histogram = stats.get("histogram") or [0] * 101
+        return {"success": True, "date": day, "score": score, **self._rank_in_histogram(histogram, score)}
+
+    def rebuild_daily_stats(self) -> int:
+        """Recompute every day's leaderboard aggregate from user records; returns days built."""
+        rebuilt: Dict[str, Dict[str, Any]] = {}
+        for username, u in self._users_store.items():
+            for day, score in self._user_daily_scores(u).items():
+                rebuilt[day] = self._add_to_daily_stats(rebuilt.get(day), day, username, score)
+        # Keep versions moving forward so cached copies of a rebuilt day are never reused
+        for day, previous in self._daily_stats_store.items():
+            if day in rebuilt:
+                rebuilt[day]["version"] = previous.get("version", 0) + 1
+        self._daily_stats_store.save_all(rebuilt)
+        # Days missing from the old store restart at version 1; a new epoch keeps their ETags distinct
+        self._meta_store.put("daily_stats_epoch", secrets.token_hex(4))
+        return len(rebuilt)
 
     def get_daily_leaderboard_for_date(self, target_date: Optional[str] = None) -> Dict[str, Any]:
         """
         Everyone tied for the highest score on the given day (default: today, server local time).
         """
         day = (target_date or datetime.now().strftime("%Y-%m-%d")).strip()
-        users = self._load_users()
-        entries: List[Dict[str, Any]] = []
-        for username, u in users.items():
-            score = self._user_daily_score_on_date(u, day)
-            if score is None:
-                continue
-            entries.append({"username": username, "score": score})
-        submission_count = len(entries)
-        if not entries:
+        stats = self._daily_stats_store.get(day)
+        if not stats or not stats.get("submission_count"):
             return {
                 "success": True,
                 "date": day,
@@ -524,25 +1124,41 @@ class AuthService:
                 "leaders": [],
                 "submission_count": 0,
             }
-        top = max(e["score"] for e in entries)
-        leaders = sorted(
-            [e for e in entries if e["score"] == top],
-            key=lambda x: x["username"].lower(),
-        )
+        top = stats["top_score"]
         return {
             "success": True,
             "date": day,
             "top_score": top,
-            "leaders": leaders,
-            "submission_count": submission_count,
+            "leaders": [{"username": username, "score": top} for username in stats["leaders"]],
+            "submission_count": stats["submission_count"],
         }
 
+    def _daily_stats_epoch(self) -> str:
+        """
+        Random generation of the daily_stats store: replaced on every rebuild and created afresh
+        after a reset wipes meta, so restarted per-day versions never repeat an earlier ETag.
+        """
+        epoch = self._meta_store.get("daily_stats_epoch")
+        if epoch is None:
+            fresh = secrets.token_hex(4)
+            epoch = self._meta_store.update(
+                "daily_stats_epoch", lambda current: (fresh, fresh) if current is None else (None, current)
+            )
+        return epoch
+    
+    def get_daily_leaderboard_version(self, target_date: str) -> str:
+        """
+        Version of a day's leaderboard ('<epoch>-0' before the first submission); changes on every
+        submission and on every rebuild or reset of the aggregates.
+        """
+        stats = self._daily_stats_store.get(target_date.strip())
+        return f"{self._daily_stats_epoch()}-{(stats or {}).get('version', 0)}"
+
     def count_active_sessions(self) -> int:
         """Non-expired sessions (excludes pending Google username setup)."""
-        sessions = self._load_sessions()
         now = datetime.now()
         n = 0
-        for data in sessions.values():
+        for data in self._sessions_store.values():
             if data.get("google_user"):
                 continue
             try:
@@ -552,55 +1168,190 @@ class AuthService:
                 continue
         return n
 
+    # Active sessions are counted per expiry hour, so they age out without any event
+    _SESSION_BUCKET = "sessions_expiring:"
+
+    def _session_bucket(self, expires_at: str) -> str:
+        return self._SESSION_BUCKET + expires_at[:13]  # YYYY-MM-DDTHH
+
+    def _count_metrics(self) -> Dict[str, int]:
+        """Full recount of the overview counters (first run only)."""
+        counters: Dict[str, int] = {"users": 0, "submissions": 0}
+        for u in self._users_store.values():
+            counters["users"] += 1
+            counters["submissions"] += self._detailed_submission_count(u)
+        now = datetime.now()
+        for data in self._sessions_store.values():
+            if data.get("google_user") or not data.get("username"):
+                continue
+            try:
+                if datetime.fromisoformat(data["expires_at"]) > now:
+                    bucket = self._session_bucket(data["expires_at"])
+                    counters[bucket] = counters.get(bucket, 0) + 1
+            except (KeyError, ValueError, TypeError):
+                continue
+        return counters
+
+    def _ensure_metrics(self):
+        try:
+            self.metrics.seed("auth", self._count_metrics)
+        except Exception as e:
+            print(f"AuthService - metrics seed failed: {e}")
+
+    def reconcile_metrics(self) -> Dict[str, int]:
+        """Recount users, submissions and live sessions into the registry; returns drifted counters."""
+        return self.metrics.reconcile(
+            self._count_metrics,
+            lambda name: name in ("users", "submissions") or name.startswith(self._SESSION_BUCKET),
+        )
+
+    def get_overview_counters(self) -> Dict[str, int]:
+        """User, submission and live-session counts from the metrics registry (no scans)."""
+        counters = self.metrics.snapshot()
+        live_from = self._session_bucket(datetime.now().isoformat())
+        active = sum(
+            n for name, n in counters.items()
+            if name.startswith(self._SESSION_BUCKET) and name >= live_from
+        )
+        return {
+            "user_count": counters.get("users", 0),
+            "active_sessions": max(active, 0),
+            "total_daily_submissions_recorded": counters.get("submissions", 0),
+        }
+
+    def sweep_expired_sessions(self) -> int:
+        """Remove expired sessions and stale Google setup tokens in one pass; returns how many."""
+        live_from = self._session_bucket(datetime.now().isoformat())
+        self.metrics.discard(lambda name: name.startswith(self._SESSION_BUCKET) and name < live_from)
+        if isinstance(self._sessions_store, SessionLog):
+            return self._sessions_store.sweep_expired()
+        now = datetime.now()
+        expired = []
+        for token, data in self._sessions_store.items():
+            try:
+                if datetime.fromisoformat(data["expires_at"]) <= now:
+                    expired.append(token)
+            except (KeyError, ValueError, TypeError):
+                continue
+        if not expired:
+            return 0
+        return self._sessions_store.delete_many(expired)
+
+    def start_session_sweeper(self, interval: float) -> Optional[threading.Thread]:
+        """
+        Run sweep_expired_sessions every `interval` seconds on a daemon thread, then reconcile
+        the overview counters against a full recount (same cadence, one scan per interval).
+        """
+        if interval <= 0:
+            return None
+
+        def _loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    removed = self.sweep_expired_sessions()
+                    if removed:
+                        print(f"🧹 AuthService - swept {removed} expired sessions")
+                except Exception as e:
+                    print(f"Session sweep failed: {e}")
+                try:
+                    drift = self.reconcile_metrics()
+                    if drift:
+                        print(f"📊 AuthService - reconciled {len(drift)} drifted counters")
+                except Exception as e:
+                    print(f"Metrics reconcile failed: {e}")
+
+        thread = threading.Thread(target=_loop, name="session-sweeper", daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _admin_user_row(username: str, u: Dict[str, Any]) -> Dict[str, Any]:
+        """Admin dashboard row for one user (no password_hash)."""
+        return {
+            "username": username,
+            "email": u.get("email"),
+            "created_at": u.get("created_at"),
+            "last_login": u.get("last_login"),
+            "games_played": u.get("games_played", 0),
+            "total_score": u.get("total_score", 0),
+            "best_score": u.get("best_score", 0),
+            "daily_submit_days": AuthService._calendar_of(u).count(),
+            "detailed_submissions": AuthService._detailed_submission_count(u),
+            "last_daily_submission": u.get("last_daily_submission"),
+        }
+
     def get_admin_user_summaries(self) -> List[Dict[str, Any]]:
         """All users without password_hash (admin dashboard)."""
-        users = self._load_users()
-        rows: List[Dict[str, Any]] = []
-        for username, u in users.items():
-            rows.append(
-                {
-                    "username": username,
-                    "email": u.get("email"),
-                    "created_at": u.get("created_at"),
-                    "last_login": u.get("last_login"),
-                    "games_played": u.get("games_played", 0),
-                    "total_score": u.get("total_score", 0),
-                    "best_score": u.get("best_score", 0),
-                    "daily_submit_days": len(u.get("daily_scores") or {}),
-                    "detailed_submissions": len(u.get("submission_history") or {}),
-                    "last_daily_submission": u.get("last_daily_submission"),
-                }
-            )
+        rows = [self._admin_user_row(username, u) for username, u in self._users_store.items()]
         rows.sort(key=lambda r: r.get("created_at") or "", reverse=True)
         return rows
 
+    def rebuild_user_index(self) -> int:
+        """Rewrite the user index from user records, oldest registration first; returns users."""
+        entries = [
+            {"username": username, "created_at": u.get("created_at")} for username, u in self._users_store.items()
+        ]
+        entries.sort(key=lambda e: e["created_at"] or "")
+        self._user_index.replace(entries)
+        return len(entries)
+
+    def get_admin_users_page(self, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Newest registrations first, one user lookup per row; pass next_cursor back for more.
+        Raises ValueError on a cursor that is not a log position.
+        """
+        entries, next_cursor = self._user_index.scan_reverse(self._log_position(cursor), limit)
+        rows = []
+        for entry in entries:
+            u = self._get_user(entry.get("username"))
+            if u is not None:
+                rows.append(self._admin_user_row(entry["username"], u))
+        return {"users": rows, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _admin_submission_row(username: str, date_str: str, sub: Dict[str, Any]) -> Dict[str, Any]:
+        """Admin dashboard row for one submission (poem truncated)."""
+        poem = sub.get("poem_text") or ""
+        return {
+            "username": username,
+            "date": date_str,
+            "score": sub.get("score"),
+            "theme": sub.get("theme"),
+            "emotion": sub.get("emotion"),
+            "mode": sub.get("mode"),
+            "word_bank_used": sub.get("word_bank_used"),
+            "submitted_at": sub.get("submitted_at"),
+            "poem_preview": poem[:280] + ("…" if len(poem) > 280 else ""),
+        }
+
+    def rebuild_submission_index(self) -> int:
+        """Rewrite the submission index from the day partitions, oldest first; returns rows."""
+        rows: List[Dict[str, Any]] = []
+        for date_str in self._submission_dates():
+            for username, sub in self._submissions_on(date_str).items():
+                if isinstance(sub, dict):
+                    rows.append(self._admin_submission_row(username, date_str, sub))
+        rows.sort(key=lambda r: (r.get("submitted_at") or r.get("date") or ""))
+        self._submission_index.replace(rows)
+        return len(rows)
+
+    @staticmethod
+    def _log_position(cursor: Optional[str]) -> Optional[str]:
+        """An append-log position from a decoded cursor; raises ValueError if it is not one."""
+        if cursor is not None and not cursor.isdigit():
+            raise ValueError(f"Invalid log position: {cursor}")
+        return cursor
+
+    def get_admin_submissions_page(self, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Newest-first page of the submission index; pass next_cursor back for older rows.
+        Raises ValueError on a cursor that is not a log position.
+        """
+        limit = max(1, min(limit, 500))
+        rows, next_cursor = self._submission_index.scan_reverse(self._log_position(cursor), limit)
+        return {"submissions": rows, "next_cursor": next_cursor}
+
     def get_admin_recent_submissions(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Latest daily submissions across all users (poem truncated)."""
-        users = self._load_users()
-        rows: List[Dict[str, Any]] = []
-        for username, u in users.items():
-            hist = u.get("submission_history") or {}
-            if not isinstance(hist, dict):
-                continue
-            for date_str, sub in hist.items():
-                if not isinstance(sub, dict):
-                    continue
-                poem = sub.get("poem_text") or ""
-                rows.append(
-                    {
-                        "username": username,
-                        "date": date_str,
-                        "score": sub.get("score"),
-                        "theme": sub.get("theme"),
-                        "emotion": sub.get("emotion"),
-                        "mode": sub.get("mode"),
-                        "word_bank_used": sub.get("word_bank_used"),
-                        "submitted_at": sub.get("submitted_at"),
-                        "poem_preview": poem[:280] + ("…" if len(poem) > 280 else ""),
-                    }
-                )
-        rows.sort(
-            key=lambda r: (r.get("submitted_at") or r.get("date") or ""),
-            reverse=True,
-        )
-        return rows[: max(1, min(limit, 500))]
+        return self.get_admin_submissions_page(limit)["submissions"]
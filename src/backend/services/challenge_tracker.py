@@ -3,48 +3,92 @@ Challenge Tracker Service
 Tracks daily challenges for future archive mode functionality
 """
 
-import json
+import bisect
 import csv
+import io
+import json
+import math
 import os
-from datetime import datetime, date
-from typing import Dict, List, Any, Optional
+import threading
+from collections import OrderedDict
+from datetime import datetime, date, timedelta
+from typing import Callable, Dict, Iterator, List, Any, Optional
+
+from src.backend.services.persistence import FileLock, atomic_write_bytes, atomic_write_json
+from src.backend.services.storage import Collection, JsonCollection, MemoryCollection
+
+CSV_HEADER = [
+    'date', 'theme', 'emotion', 'word1', 'word2', 'word3', 'word4',
+    'submissions_count', 'avg_score', 'best_score', 'created_at'
+]
+
+def empty_stats() -> Dict[str, Any]:
+    """Running score accumulators for one challenge day (see ChallengeTracker.increment_stats)"""
+    return {'count': 0, 'sum': 0, 'sum_sq': 0, 'min': None, 'max': None}
+
+def legacy_stats(challenge: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Accumulators for a record that only has submissions_count/avg_score/best_score.
+    The sum of squares (so the spread) and the minimum of those past scores are unknown:
+    sum_sq and min are None and stay None however many scores are added later.
+    """
+    count = int(challenge.get('submissions_count') or 0)
+    if not count:
+        return empty_stats()
+    best = challenge.get('best_score')
+    return {
+        'count': count,
+        'sum': round(float(challenge.get('avg_score') or 0.0) * count),
+        'sum_sq': None,
+        'min': None,
+        'max': best,
+    }
 
 class ChallengeTracker:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
         self.challenges_file = os.path.join(data_dir, "daily_challenges.json")
         self.challenges_csv = os.path.join(data_dir, "daily_challenges.csv")
-        self._use_memory_storage = False
-        self._challenges = {}
+        self._store: Collection = JsonCollection(self.challenges_file)
+        # Serializes CSV appends against compaction across worker processes
+        self._csv_lock = FileLock(f"{self.challenges_csv}.lock")
+        # Finished daily prompt payloads by date, least recently used first (see get_daily_payload)
+        self._payloads: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._payload_lock = threading.Lock()
+        # Sorted dates for range queries, kept current on insert (see _index_dates)
+        self._date_index: Optional[List[str]] = None
+        self._index_lock = threading.Lock()
         
         # Create data directory if it doesn't exist
         try:
             os.makedirs(data_dir, exist_ok=True)
         except PermissionError:
-            self._use_memory_storage = True
+            self._store = MemoryCollection()
             return
         
         # Initialize files if they don't exist
         try:
             self._init_files()
         except PermissionError:
-            self._use_memory_storage = True
+            self._store = MemoryCollection()
+    
+    @property
+    def _use_memory_storage(self) -> bool:
+        if isinstance(self._store, JsonCollection):
+            return self._store.is_memory
+        return True
     
     def _init_files(self):
         """Initialize tracking files if they don't exist"""
         # Initialize JSON file
         if not os.path.exists(self.challenges_file):
-            with open(self.challenges_file, 'w') as f:
-                json.dump({}, f)
+            atomic_write_json(self.challenges_file, {})
         
         # Initialize CSV file with headers
         if not os.path.exists(self.challenges_csv):
             with open(self.challenges_csv, 'w', newline='') as f:
                 writer = csv.writer(f)
-                writer.writerow([
-                    'date', 'theme', 'emotion', 'word1', 'word2', 'word3', 'word4',
-                    'submissions_count', 'avg_score', 'best_score', 'created_at'
-                ])
+                writer.writerow(CSV_HEADER)
     
     def track_challenge(self, challenge_data: Dict[str, Any], submissions_count: int = 0, 
                        avg_score: float = 0.0, best_score: int = 0, target_date: Optional[str] = None) -> bool:
@@ -52,27 +96,34 @@ class ChallengeTracker:
         try:
             today = (target_date or date.today().isoformat()).strip()
             
-            # Load existing challenges
-            challenges = self._load_challenges()
-            
             # Create challenge record
             challenge_record = {
                 'date': today,
                 'theme': challenge_data.get('theme', ''),
                 'emotion': challenge_data.get('emotion', ''),
                 'words': challenge_data.get('words', []),
-                'submissions_count': submissions_count,
-                'avg_score': avg_score,
-                'best_score': best_score,
+                'stats': legacy_stats({
+                    'submissions_count': submissions_count,
+                    'avg_score': avg_score,
+                    'best_score': best_score,
+                }),
                 'created_at': datetime.now().isoformat()
             }
             
-            # Store in JSON format
-            challenges[today] = challenge_record
-            self._save_challenges(challenges)
+            # Store in JSON format; `version` moves on every write (ETags key off it).
+            # Re-tracking a date replaces the prompt but keeps the scores already counted.
+            def _apply(current):
+                if current is not None:
+                    challenge_record['stats'] = current.get('stats') or legacy_stats(current)
+                challenge_record['version'] = (current or {}).get('version', 0) + 1
+                return challenge_record, current is None
             
-            # Append to CSV
-            self._append_to_csv(challenge_record)
+            is_new = self._store.update(today, _apply)
+            self._forget_payloads([today])
+            if is_new:
+                self._index_dates([today])
+                # One CSV row per date; compact_csv() refreshes rows of re-tracked dates
+                self._append_to_csv(challenge_record)
             
             return True
             
@@ -82,124 +133,345 @@ class ChallengeTracker:
     
     def get_challenge_by_date(self, target_date: str) -> Dict[str, Any]:
         """Get challenge by specific date"""
+        challenge = self._store.get(target_date)
+        return self._with_stats(challenge) if challenge else {}
+    
+    @staticmethod
+    def _with_stats(challenge: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        The record as served: score stats derived from its accumulators (submissions_count,
+        avg_score, best_score, min_score, score_stddev) in place of the raw `stats`.
+        score_stddev is the population standard deviation; None when unknown (legacy days).
+        """
+        result = {k: v for k, v in challenge.items() if k != 'stats'}
+        stats = challenge.get('stats') or legacy_stats(challenge)
+        count = stats['count']
+        mean = stats['sum'] / count if count else 0.0
+        stddev = None
+        if count and stats['sum_sq'] is not None:
+            stddev = math.sqrt(max(stats['sum_sq'] / count - mean * mean, 0.0))
+        result.update({
+            'submissions_count': count,
+            'avg_score': mean,
+            'best_score': stats['max'] if stats['max'] is not None else 0,
+            'min_score': stats['min'],
+            'score_stddev': stddev,
+        })
+        return result
+    
+    # Dates are limited to a few days around "today", so a handful of entries covers every timezone
+    _PAYLOAD_CACHE_SIZE = 8
+    
+    def get_daily_payload(self, target_date: str) -> Optional[Dict[str, Any]]:
+        """
+        The daily prompt for a date as {'challenge': {theme, emotion, words}, 'body': its JSON bytes},
+        or None if the date has no complete record yet.
+        
+        Entries are reused while the store version is unchanged (one stat, no parse). When it has
+        moved (stats updates, other workers' writes) the record is re-read and the cached bytes kept
+        if the prompt itself is the same; track_challenge drops the date outright.
+        """
+        version = self._store.version()
+        with self._payload_lock:
+            entry = self._payloads.get(target_date)
+            if entry is not None:
+                self._payloads.move_to_end(target_date)
+        if entry is not None and version is not None and entry['version'] == version:
+            return entry
+        
+        record = self._store.get(target_date) or {}
+        if not self._is_complete(record):
+            self._forget_payloads([target_date])
+            return None
+        challenge = {
+            'theme': record['theme'],
+            'emotion': record['emotion'],
+            'words': list(record['words']),
+        }
+        if entry is None or entry['challenge'] != challenge:
+            entry = {
+                'challenge': challenge,
+                'body': json.dumps(challenge, sort_keys=True, separators=(',', ':')).encode('utf-8'),
+            }
+        # Published entries are never mutated; only the dict holding them needs the lock
+        entry = dict(entry, version=version)
+        with self._payload_lock:
+            self._payloads[target_date] = entry
+            self._payloads.move_to_end(target_date)
+            while len(self._payloads) > self._PAYLOAD_CACHE_SIZE:
+                self._payloads.popitem(last=False)
+        return entry
+    
+    def _forget_payloads(self, dates: List[str]):
+        with self._payload_lock:
+            for day in dates:
+                self._payloads.pop(day, None)
+    
+    def get_archive_version(self) -> Optional[str]:
+        """Version of the whole archive, or None when the store cannot tell cheaply"""
+        return self._store.version()
+    
+    def _dates(self) -> List[str]:
+        """
+        All stored dates, ascending; ranges are bisected instead of scanning every record.
+        Our own inserts keep the index current and stats updates never touch it. Dates are only
+        ever added, so a key count that no longer matches means another process (the scheduler
+        CLI, another worker) added some: only then is it rebuilt.
+        """
+        count = self._store.count()
+        with self._index_lock:
+            if self._date_index is None or len(self._date_index) != count:
+                self._date_index = sorted(self._store.keys())
+            return self._date_index
+    
+    def _index_dates(self, added: List[str]):
+        """Insert newly stored dates; readers keep the list they already hold (copy-on-write)."""
+        with self._index_lock:
+            if self._date_index is None:
+                return
+            dates = list(self._date_index)
+            for day in added:
+                i = bisect.bisect_left(dates, day)
+                if i == len(dates) or dates[i] != day:
+                    dates.insert(i, day)
+            self._date_index = dates
+    
+    def _dates_between(self, first: Optional[str] = None, last: Optional[str] = None) -> List[str]:
+        """Stored dates with first <= date <= last (either bound optional), ascending"""
+        dates = self._dates()
+        lo = bisect.bisect_left(dates, first) if first is not None else 0
+        hi = bisect.bisect_right(dates, last) if last is not None else len(dates)
+        return dates[lo:hi]
+    
+    def get_challenges_range(self, first: Optional[str] = None, last: Optional[str] = None) -> Dict[str, Any]:
+        """Challenges dated first..last inclusive (YYYY-MM-DD, either bound optional), oldest first"""
         challenges = self._load_challenges()
-        return challenges.get(target_date, {})
+        return {d: self._with_stats(challenges[d]) for d in self._dates_between(first, last) if d in challenges}
     
-    def get_all_challenges(self) -> Dict[str, Any]:
-        """Get all tracked challenges"""
-        return self._load_challenges()
+    def get_all_challenges(self, until: Optional[str] = None) -> Dict[str, Any]:
+        """Get all tracked challenges (only those dated on or before `until`, if given)"""
+        if until is None:
+            return {d: self._with_stats(c) for d, c in self._load_challenges().items()}
+        return self.get_challenges_range(last=until)
     
-    def get_challenges_by_month(self, year: int, month: int) -> Dict[str, Any]:
-        """Get challenges for a specific month"""
+    def get_challenges_page(self, limit: int, before: Optional[str] = None, until: Optional[str] = None) -> Dict[str, Any]:
+        """Newest-first challenges dated before `before` (and not after `until`); next_before continues the listing"""
+        dates = self._dates()
+        hi = bisect.bisect_right(dates, until) if until is not None else len(dates)
+        if before is not None:
+            hi = min(hi, bisect.bisect_left(dates, before))
+        page_dates = dates[max(0, hi - limit):hi][::-1]
         challenges = self._load_challenges()
-        month_challenges = {}
+        return {
+            'challenges': {d: self._with_stats(challenges[d]) for d in page_dates if d in challenges},
+            'next_before': page_dates[-1] if hi > limit else None
+        }
+    
+    def count_challenges(self, until: Optional[str] = None) -> int:
+        """
+        Number of tracked challenge days (none after `until`, so scheduled days stay hidden).
+        Two bisects on the incrementally kept date index: a submit's stats update never forces a
+        re-sort, so the admin overview stays cheap right after submissions. Right whichever
+        process (app worker, cron CLI) wrote the days.
+        """
+        return len(self._dates_between(last=until))
+    
+    def get_recent_challenges(self, limit: int = 14, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest tracked challenges first (skipping scheduled days after `until`)"""
+        return list(self.get_challenges_page(limit, until=until)['challenges'].values())
+    
+    def get_challenges_by_month(self, year: int, month: int, until: Optional[str] = None) -> Dict[str, Any]:
+        """Get challenges for a specific month"""
+        month_key = f"{year:04d}-{month:02d}"
+        last = f"{month_key}-31" if until is None else min(f"{month_key}-31", until)
+        return self.get_challenges_range(f"{month_key}-01", last)
+    
+    def get_challenges_by_year(self, year: int, until: Optional[str] = None) -> Dict[str, Any]:
+        """Get challenges for a calendar year"""
+        last = f"{year:04d}-12-31" if until is None else min(f"{year:04d}-12-31", until)
+        return self.get_challenges_range(f"{year:04d}-01-01", last)
+    
+    @staticmethod
+    def _is_complete(challenge: Optional[Dict[str, Any]]) -> bool:
+        return bool(challenge and challenge.get('theme') and challenge.get('emotion') and challenge.get('words'))
+    
+    def schedule_challenges(self, planner: Callable[[List[str], Dict[str, Any]], Dict[str, Any]],
+                            days: int, start: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Store challenges for `days` consecutive dates from `start` (default: server local today)
+        in one bulk write, so the request path only ever reads them. Dates that already have a
+        challenge are skipped. `planner(dates, existing)` returns {date: challenge} for the missing
+        dates, given every stored challenge as history (see WordnikService.generate_challenge_schedule).
+        """
+        first = date.fromisoformat(start) if start else date.today()
+        dates = [(first + timedelta(days=i)).isoformat() for i in range(days)]
+        existing = {d: c for d, c in self._load_challenges().items() if self._is_complete(c)}
+        missing = [d for d in dates if d not in existing]
+        planned = planner(missing, existing) if missing else {}
         
-        for date_str, challenge in challenges.items():
-            challenge_date = datetime.fromisoformat(date_str).date()
-            if challenge_date.year == year and challenge_date.month == month:
-                month_challenges[date_str] = challenge
+        created_at = datetime.now().isoformat()
+        records = {
+            day: {
+                'date': day,
+                'theme': challenge['theme'],
+                'emotion': challenge['emotion'],
+                'words': challenge['words'],
+                'stats': empty_stats(),
+                'created_at': created_at,
+                'version': 1,
+            }
+            for day, challenge in planned.items()
+        }
+        # Existing records win, including ones tracked by another worker since we read
+        added = self._store.add_many(records) if records else []
+        self._forget_payloads(added)
+        if added:
+            self._index_dates(added)
+            self._append_to_csv(*(records[day] for day in sorted(added)))
         
-        return month_challenges
+        return {
+            'scheduled': len(added),
+            'skipped': len(dates) - len(added),
+            'first_date': dates[0] if dates else None,
+            'last_date': dates[-1] if dates else None,
+        }
     
     def update_challenge_stats(self, target_date: str, submissions_count: int = None, 
                               avg_score: float = None, best_score: int = None) -> bool:
-        """Update statistics for a specific challenge"""
+        """
+        Overwrite statistics for a specific challenge (admin corrections, imports).
+        Replaces the accumulators, so the spread of the scores is unknown afterwards;
+        submissions go through increment_stats.
+        """
         try:
-            challenges = self._load_challenges()
-            
-            if target_date not in challenges:
-                return False
+            def _apply(challenge):
+                if challenge is None:
+                    return None, False
+                current = self._with_stats(challenge)
+                challenge['stats'] = legacy_stats({
+                    'submissions_count': current['submissions_count'] if submissions_count is None else submissions_count,
+                    'avg_score': current['avg_score'] if avg_score is None else avg_score,
+                    'best_score': current['best_score'] if best_score is None else best_score,
+                })
+                for field in ('submissions_count', 'avg_score', 'best_score'):
+                    challenge.pop(field, None)
+                challenge['version'] = challenge.get('version', 0) + 1
+                return challenge, True
             
-            challenge = challenges[target_date]
+            return self._store.update(target_date, _apply)
             
-            if submissions_count is not None:
-                challenge['submissions_count'] = submissions_count
-            if avg_score is not None:
-                challenge['avg_score'] = avg_score
-            if best_score is not None:
-                challenge['best_score'] = best_score
-            
-            challenges[target_date] = challenge
-            self._save_challenges(challenges)
+        except Exception as e:
+            print(f"Error updating challenge stats: {e}")
+            return False
+    
+    def increment_stats(self, target_date: str, score: int) -> bool:
+        """
+        Count one submission toward a challenge's stats as a single atomic update.
+        Folds the score into the running accumulators (count, sum, sum of squares, min, max)
+        under the store's update lock, so concurrent submits from any worker all count;
+        integer sums keep the derived average exact.
+        """
+        try:
+            def _apply(challenge):
+                if challenge is None:
+                    return None, False
+                stats = dict(challenge.get('stats') or legacy_stats(challenge))
+                # min is None either before the first score or, on legacy days, for good
+                if stats['count'] == 0:
+                    stats['min'] = score
+                elif stats['min'] is not None:
+                    stats['min'] = min(stats['min'], score)
+                stats['count'] += 1
+                stats['sum'] += score
+                if stats['sum_sq'] is not None:
+                    stats['sum_sq'] += score * score
+                stats['max'] = score if stats['max'] is None else max(stats['max'], score)
+                challenge['stats'] = stats
+                for field in ('submissions_count', 'avg_score', 'best_score'):
+                    challenge.pop(field, None)
+                challenge['version'] = challenge.get('version', 0) + 1
+                return challenge, True
             
-            return True
+            return self._store.update(target_date, _apply)
             
         except Exception as e:
             print(f"Error updating challenge stats: {e}")
             return False
     
     def _load_challenges(self) -> Dict[str, Any]:
-        """Load challenges from JSON file"""
-        if self._use_memory_storage:
-            return self._challenges
-        try:
-            with open(self.challenges_file, 'r') as f:
-                return json.load(f)
-        except Exception:
-            return {}
+        """Load challenges from JSON file (cached; do not mutate)"""
+        return self._store.load_all()
     
     def _save_challenges(self, challenges: Dict[str, Any]):
-        """Save challenges to JSON file"""
-        if self._use_memory_storage:
-            self._challenges = challenges
-            return
-        try:
-            with open(self.challenges_file, 'w') as f:
-                json.dump(challenges, f, indent=2)
-        except PermissionError:
-            self._use_memory_storage = True
-            self._challenges = challenges
+        """Save challenges to JSON file (atomic write)"""
+        self._store.save_all(challenges)
+        with self._index_lock:
+            self._date_index = None
     
-    def _append_to_csv(self, challenge_record: Dict[str, Any]):
-        """Append challenge record to CSV file"""
+    @staticmethod
+    def _csv_row(challenge: Dict[str, Any]) -> List[Any]:
+        words = challenge.get('words', [])
+        return [
+            challenge.get('date', ''),
+            challenge.get('theme', ''),
+            challenge.get('emotion', ''),
+            words[0] if len(words) > 0 else '',
+            words[1] if len(words) > 1 else '',
+            words[2] if len(words) > 2 else '',
+            words[3] if len(words) > 3 else '',
+            challenge.get('submissions_count', 0),
+            challenge.get('avg_score', 0.0),
+            challenge.get('best_score', 0),
+            challenge.get('created_at', '')
+        ]
+    
+    def _append_to_csv(self, *challenge_records: Dict[str, Any]):
+        """Append challenge records to CSV file (one open for the batch)"""
         try:
-            with open(self.challenges_csv, 'a', newline='') as f:
+            with self._csv_lock, open(self.challenges_csv, 'a', newline='') as f:
                 writer = csv.writer(f)
-                words = challenge_record.get('words', [])
-                writer.writerow([
-                    challenge_record['date'],
-                    challenge_record['theme'],
-                    challenge_record['emotion'],
-                    words[0] if len(words) > 0 else '',
-                    words[1] if len(words) > 1 else '',
-                    words[2] if len(words) > 2 else '',
-                    words[3] if len(words) > 3 else '',
-                    challenge_record['submissions_count'],
-                    challenge_record['avg_score'],
-                    challenge_record['best_score'],
-                    challenge_record['created_at']
-                ])
+                for challenge_record in challenge_records:
+                    writer.writerow(self._csv_row(self._with_stats(challenge_record)))
         except Exception as e:
             print(f"Error appending to CSV: {e}")
     
+    def iter_challenges_csv(self, until: Optional[str] = None) -> Iterator[str]:
+        """CSV text for every challenge (oldest first, none after `until`), one line per yield"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        
+        def _line(row: List[Any]) -> str:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            return buffer.getvalue()
+        
+        yield _line(CSV_HEADER)
+        challenges = self._load_challenges()
+        for date_str in self._dates_between(last=until):
+            if date_str in challenges:
+                yield _line(self._csv_row(self._with_stats(challenges[date_str])))
+    
+    def iter_challenges_ndjson(self, until: Optional[str] = None) -> Iterator[str]:
+        """One JSON object per line for every challenge (oldest first, none after `until`)"""
+        challenges = self._load_challenges()
+        for date_str in self._dates_between(last=until):
+            if date_str in challenges:
+                yield json.dumps(self._with_stats(challenges[date_str]), sort_keys=True) + "\n"
+    
     def export_challenges_csv(self, output_file: str = None) -> str:
         """Export all challenges to a new CSV file"""
         if output_file is None:
             output_file = os.path.join(self.data_dir, f"challenges_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
         
-        challenges = self._load_challenges()
-        
         with open(output_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                'date', 'theme', 'emotion', 'word1', 'word2', 'word3', 'word4',
-                'submissions_count', 'avg_score', 'best_score', 'created_at'
-            ])
-            
-            for date_str, challenge in challenges.items():
-                words = challenge.get('words', [])
-                writer.writerow([
-                    challenge['date'],
-                    challenge['theme'],
-                    challenge['emotion'],
-                    words[0] if len(words) > 0 else '',
-                    words[1] if len(words) > 1 else '',
-                    words[2] if len(words) > 2 else '',
-                    words[3] if len(words) > 3 else '',
-                    challenge['submissions_count'],
-                    challenge['avg_score'],
-                    challenge['best_score'],
-                    challenge['created_at']
-                ])
+            f.writelines(self.iter_challenges_csv())
         
         return output_file
+    
+    def compact_csv(self) -> int:
+        """Rewrite daily_challenges.csv from the JSON records (one row per date); returns rows"""
+        with self._csv_lock:
+            lines = list(self.iter_challenges_csv())
+            atomic_write_bytes(self.challenges_csv, "".join(lines).encode('utf-8'))
+        return len(lines) - 1
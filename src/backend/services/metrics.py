@@ -0,0 +1,163 @@
+"""
+Metrics Registry
+Live counters for the admin dashboard, checkpointed to storage instead of recomputed
+"""
+
+import atexit
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from src.backend.services.storage import Collection
+
+
+class MetricsRegistry:
+    """
+    Named integer counters stored as one document.
+
+    Each process accumulates increments in memory and folds them into the
+    stored document every `checkpoint_interval` seconds (METRICS_CHECKPOINT_INTERVAL)
+    with a single atomic update, and once more at exit. Reads return the stored
+    value plus this process's pending delta; other workers' pending deltas show up
+    after their next checkpoint.
+    """
+
+    SEEDED = "_seeded"
+
+    def __init__(self, store: Collection, key: str = "counters", checkpoint_interval: Optional[float] = None):
+        self._store = store
+        self._key = key
+        self.checkpoint_interval = checkpoint_interval if checkpoint_interval is not None else float(
+            os.getenv("METRICS_CHECKPOINT_INTERVAL", "5")
+        )
+        self._pending: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        atexit.register(self.checkpoint)
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._pending[name] = self._pending.get(name, 0) + amount
+        if self.checkpoint_interval <= 0:
+            self.checkpoint()
+        else:
+            self._ensure_flusher()
+
+    def decr(self, name: str, amount: int = 1):
+        self.incr(name, -amount)
+
+    def snapshot(self) -> Dict[str, int]:
+        """All counters (stored + this process's pending increments)."""
+        counters = dict(self._store.get(self._key) or {})
+        with self._lock:
+            for name, delta in self._pending.items():
+                counters[name] = counters.get(name, 0) + delta
+        counters.pop(self.SEEDED, None)
+        return counters
+
+    def get(self, name: str, default: int = 0) -> int:
+        stored = (self._store.get(self._key) or {}).get(name, default)
+        with self._lock:
+            return stored + self._pending.get(name, 0)
+
+    def is_seeded(self, name: str) -> bool:
+        return name in ((self._store.get(self._key) or {}).get(self.SEEDED) or [])
+
+    def seed(self, name: str, compute: Callable[[], Dict[str, int]]):
+        """
+        First run only: set counters from a full recount. `name` marks the group as seeded so
+        every later process (and restart) trusts the incremental values instead.
+        """
+        if self.is_seeded(name):
+            return
+        values = compute()
+
+        def _apply(counters):
+            counters = counters or {}
+            seeded = counters.get(self.SEEDED) or []
+            if name in seeded:
+                return None, False
+            counters.update(values)
+            counters[self.SEEDED] = seeded + [name]
+            return counters, True
+
+        self._store.update(self._key, _apply)
+
+    def reconcile(self, compute: Callable[[], Dict[str, int]], owns: Callable[[str], bool]) -> Dict[str, int]:
+        """
+        Overwrite the counters `owns` with a full recount, repairing drift from deltas a killed
+        worker never checkpointed. Stored counters it owns but the recount lacks are removed.
+        Other workers' in-flight deltas may still land on top; the next reconcile absorbs them.
+        Returns the stored value each changed counter had (name -> old value).
+        """
+        # Our own pending deltas are already reflected in the data being recounted
+        self.checkpoint()
+        with self._lock:
+            self._pending = {n: d for n, d in self._pending.items() if not owns(n)}
+        values = compute()
+
+        def _apply(counters):
+            counters = counters or {}
+            drift = {n: v for n, v in counters.items() if n != self.SEEDED and owns(n) and n not in values}
+            drift.update({n: counters.get(n, 0) for n, v in values.items() if counters.get(n, 0) != v})
+            if not drift:
+                return None, drift
+            for n in drift:
+                counters.pop(n, None)
+            counters.update(values)
+            return counters, drift
+
+        return self._store.update(self._key, _apply)
+
+    def discard(self, should_drop: Callable[[str], bool]) -> int:
+        """Remove stored counters whose name matches (e.g. expired time buckets)."""
+        def _apply(counters):
+            if not counters:
+                return None, 0
+            dropped = [n for n in counters if n != self.SEEDED and should_drop(n)]
+            for n in dropped:
+                del counters[n]
+            return (counters if dropped else None), len(dropped)
+
+        with self._lock:
+            for n in [n for n in self._pending if should_drop(n)]:
+                del self._pending[n]
+        return self._store.update(self._key, _apply)
+
+    def checkpoint(self):
+        """Fold this process's pending increments into the stored document."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        pending = {n: d for n, d in pending.items() if d}
+        if not pending:
+            return
+
+        def _apply(counters):
+            counters = counters or {}
+            for name, delta in pending.items():
+                counters[name] = counters.get(name, 0) + delta
+            return counters, None
+
+        try:
+            self._store.update(self._key, _apply)
+        except Exception as e:
+            # Keep the increments for the next attempt
+            with self._lock:
+                for name, delta in pending.items():
+                    self._pending[name] = self._pending.get(name, 0) + delta
+            print(f"MetricsRegistry - checkpoint failed: {e}")
+
+    def _ensure_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name="metrics-checkpoint", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.checkpoint_interval)
+            self.checkpoint()
@@ -0,0 +1,91 @@
+"""
+Password Hasher
+bcrypt hashing on a small, bounded worker pool so logins cannot starve other requests
+"""
+
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Too many hash/verify calls are already queued; the caller should retry shortly."""
+
+
+class PasswordHasher:
+    """
+    bcrypt with a configurable cost (BCRYPT_ROUNDS).
+
+    Work runs on at most PASSWORD_HASH_WORKERS threads (bcrypt releases the GIL,
+    so request threads keep running meanwhile). At most PASSWORD_HASH_QUEUE calls
+    may be running or waiting; further callers wait up to PASSWORD_HASH_WAIT
+    seconds for a slot, then get PasswordHasherBusy instead of piling up.
+
+    Legacy `salt:sha256hex` hashes still verify; `needs_rehash` flags them (and
+    bcrypt hashes below the configured cost) for an upgrade on the next login.
+    """
+
+    def __init__(
+        self,
+        rounds: Optional[int] = None,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        wait: Optional[float] = None,
+    ):
+        self.rounds = rounds if rounds is not None else int(os.getenv("BCRYPT_ROUNDS", "12"))
+        workers = workers if workers is not None else int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+        max_pending = max_pending if max_pending is not None else int(
+            os.getenv("PASSWORD_HASH_QUEUE", str(workers * 8))
+        )
+        self.wait = wait if wait is not None else float(os.getenv("PASSWORD_HASH_WAIT", "5"))
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self.rejected = 0
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.wait):
+            self.rejected += 1
+            raise PasswordHasherBusy("password hashing queue is full")
+        try:
+            return self._pool.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _is_bcrypt(stored_hash: str) -> bool:
+        return stored_hash.startswith(("$2a$", "$2b$", "$2y$"))
+
+    def hash(self, password: str) -> str:
+        return self._run(self._hash_sync, password)
+
+    def _hash_sync(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=self.rounds)).decode("ascii")
+
+    def verify(self, password: str, stored_hash: str) -> bool:
+        if not stored_hash:
+            return False
+        if self._is_bcrypt(stored_hash):
+            try:
+                return self._run(bcrypt.checkpw, password.encode("utf-8"), stored_hash.encode("ascii"))
+            except ValueError:
+                return False
+        # Legacy salt:sha256 (one cheap digest, no need for the pool)
+        try:
+            salt, password_hash = stored_hash.split(":")
+        except ValueError:
+            return False
+        test_hash = hashlib.sha256((password + salt).encode()).hexdigest()
+        return hmac.compare_digest(test_hash, password_hash)
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        if not self._is_bcrypt(stored_hash):
+            return True
+        try:
+            return int(stored_hash.split("$")[2]) < self.rounds
+        except (IndexError, ValueError):
+            return True
@@ -0,0 +1,212 @@
+"""
+Persistence Helpers
+Crash-safe file writes and group commit for the JSON data files
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts fall back to in-process locking only
+    fcntl = None
+
+
+class CorruptDataError(RuntimeError):
+    """A data file exists but cannot be parsed; refuse to treat it as empty."""
+
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path: str, data: bytes):
+    """
+    Write to a temp file in the same directory, fsync, then rename over `path`.
+    Readers see either the old file or the new one, never a partial write.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(path)
+
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = 2):
+    atomic_write_bytes(path, json.dumps(data, indent=indent).encode('utf-8'))
+
+
+def read_json(path: str, default: Any = None) -> Any:
+    """Parse a JSON file; missing file gives `default`, unparsable file raises CorruptDataError."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except json.JSONDecodeError as e:
+        raise CorruptDataError(f"{path} is not valid JSON: {e}") from e
+
+
+class FileLock:
+    """
+    Exclusive lock shared by every thread and process that uses the same lock file.
+
+    Re-entrant within a thread. Uses flock(2) on `path`; where that is unavailable
+    (non-POSIX, or a read-only volume) it degrades to an in-process lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._fh = None
+        self.acquisitions = 0
+        self.waits = 0
+
+    def __enter__(self):
+        self._rlock.acquire()
+        self._depth += 1
+        if self._depth > 1 or fcntl is None:
+            return self
+        try:
+            self._fh = open(self.path, 'a')
+        except OSError:
+            self._fh = None
+            return self
+        try:
+            fcntl.flock(self._fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self.waits += 1
+            fcntl.flock(self._fh, fcntl.LOCK_EX)
+        self.acquisitions += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._depth == 1 and self._fh is not None:
+                try:
+                    fcntl.flock(self._fh, fcntl.LOCK_UN)
+                finally:
+                    self._fh.close()
+                    self._fh = None
+        finally:
+            self._depth -= 1
+            self._rlock.release()
+        return False
+
+
+class _Ticket:
+    __slots__ = ('fn', 'result', 'error', 'done')
+
+    def __init__(self, fn: Callable[[Any], Tuple[bool, Any]]):
+        self.fn = fn
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+
+
+class GroupCommitter:
+    """
+    Coalesce concurrent read-modify-write requests against one file into a single write.
+
+    Each caller submits a mutation `fn(state) -> (changed, result)`. The first caller becomes
+    the leader: it waits `window` seconds for others to queue up, loads the state
+    once, applies every queued mutation in order, persists once, and wakes the
+    followers with their individual results. Callers that arrive while a write is
+    in flight form the next batch. A batch in which nothing changed is not written.
+
+    With a `lock`, load + apply + store run while holding it, so batches from
+    different processes serialize and each one starts from the latest file.
+
+    `load` must return state private to the batch (a copy, never the object readers
+    see) and `store` must only publish it once persisted: if the store raises, the
+    mutated state is dropped and every ticket in the batch gets the error.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], Any],
+        store: Callable[[Any], None],
+        window: Optional[float] = None,
+        lock: Optional[FileLock] = None,
+    ):
+        self._load = load
+        self._store = store
+        self._file_lock = lock
+        self.window = window if window is not None else float(os.getenv("GROUP_COMMIT_WINDOW_MS", "2")) / 1000.0
+        self._cond = threading.Condition()
+        self._queue: List[_Ticket] = []
+        self._leader_active = False
+        self.batches = 0
+        self.mutations = 0
+
+    def submit(self, fn: Callable[[Any], Tuple[bool, Any]]) -> Any:
+        ticket = _Ticket(fn)
+        with self._cond:
+            self._queue.append(ticket)
+            while not ticket.done and self._leader_active:
+                self._cond.wait()
+            if not ticket.done:
+                self._leader_active = True
+        if not ticket.done:
+            self._lead()
+        if ticket.error is not None:
+            raise ticket.error
+        return ticket.result
+
+    def _lead(self):
+        if self.window > 0:
+            time.sleep(self.window)
+        with self._cond:
+            batch, self._queue = self._queue, []
+        try:
+            if self._file_lock is not None:
+                with self._file_lock:
+                    self._apply_batch(batch)
+            else:
+                self._apply_batch(batch)
+        except BaseException as e:
+            for t in batch:
+                if t.error is None:
+                    t.error = e
+        finally:
+            with self._cond:
+                self.batches += 1
+                self.mutations += len(batch)
+                for t in batch:
+                    t.done = True
+                self._leader_active = False
+                self._cond.notify_all()
+
+    def _apply_batch(self, batch: List[_Ticket]):
+        state = self._load()
+        dirty = False
+        for t in batch:
+            try:
+                changed, t.result = t.fn(state)
+                dirty = dirty or changed
+            except Exception as e:
+                t.error = e
+        if dirty:
+            self._store(state)
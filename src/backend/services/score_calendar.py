@@ -0,0 +1,119 @@
+"""
+Score Calendar
+Dense per-user daily score vector (one signed byte per day) for heatmaps and range queries
+"""
+
+import base64
+from array import array
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Day 0 of every calendar; earlier days get negative indexes
+EPOCH = date(2020, 1, 1)
+NO_SCORE = -1
+
+DayLike = Union[date, str]
+
+
+def day_index(day: DayLike) -> int:
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return (day - EPOCH).days
+
+
+class ScoreCalendar:
+    """
+    `scores[i]` is the score for epoch day `start + i`, or NO_SCORE when nothing was
+    submitted. Stored on the user record as {'start': int, 'scores': base64}, about
+    one byte per day from first to last submission.
+    """
+
+    def __init__(self, start: int = 0, scores: Optional[array] = None):
+        self.start = start
+        self.scores = scores if scores is not None else array('b')
+
+    # -- conversion ----------------------------------------------------
+
+    @classmethod
+    def from_daily_scores(cls, daily_scores: Dict[str, Any]) -> "ScoreCalendar":
+        cal = cls()
+        for day, entry in (daily_scores or {}).items():
+            if not isinstance(entry, dict) or not entry.get('submitted'):
+                continue
+            try:
+                cal.set(day, int(entry.get('score', 0)))
+            except (TypeError, ValueError):
+                continue
+        return cal
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "ScoreCalendar":
+        scores = array('b')
+        scores.frombytes(base64.b64decode(record.get('scores', '')))
+        return cls(int(record.get('start', 0)), scores)
+
+    def to_record(self) -> Dict[str, Any]:
+        return {'start': self.start, 'scores': base64.b64encode(self.scores.tobytes()).decode('ascii')}
+
+    # -- access --------------------------------------------------------
+
+    def set(self, day: DayLike, score: int):
+        idx = day_index(day)
+        score = max(0, min(int(score), 127))
+        if not self.scores:
+            self.start = idx
+        elif idx < self.start:
+            self.scores = array('b', [NO_SCORE] * (self.start - idx)) + self.scores
+            self.start = idx
+        pos = idx - self.start
+        if pos >= len(self.scores):
+            self.scores.extend([NO_SCORE] * (pos - len(self.scores) + 1))
+        self.scores[pos] = score
+
+    def get(self, day: DayLike) -> Optional[int]:
+        pos = day_index(day) - self.start
+        if 0 <= pos < len(self.scores) and self.scores[pos] != NO_SCORE:
+            return self.scores[pos]
+        return None
+
+    def range(self, first: DayLike, last: DayLike) -> List[Optional[int]]:
+        """Scores for every day from `first` to `last` inclusive (None = no submission)."""
+        lo, hi = day_index(first), day_index(last)
+        out: List[Optional[int]] = [None] * max(0, hi - lo + 1)
+        a, b = max(lo, self.start), min(hi, self.start + len(self.scores) - 1)
+        if a <= b:
+            chunk = self.scores[a - self.start:b - self.start + 1]
+            out[a - lo:b - lo + 1] = [s if s != NO_SCORE else None for s in chunk]
+        return out
+
+    def year(self, year: int) -> List[Optional[int]]:
+        return self.range(date(year, 1, 1), date(year, 12, 31))
+
+    def days(self) -> List[Tuple[str, int]]:
+        """(YYYY-MM-DD, score) for every submitted day, oldest first."""
+        return [
+            ((EPOCH + timedelta(days=self.start + pos)).isoformat(), score)
+            for pos, score in enumerate(self.scores)
+            if score != NO_SCORE
+        ]
+
+    def best(self) -> int:
+        return max(self.scores, default=0)
+
+    def count(self) -> int:
+        return len(self.scores) - self.scores.count(NO_SCORE)
+
+    def last_day(self) -> Optional[date]:
+        for pos in range(len(self.scores) - 1, -1, -1):
+            if self.scores[pos] != NO_SCORE:
+                return EPOCH + timedelta(days=self.start + pos)
+        return None
+
+    def streaks(self) -> Tuple[int, int, Optional[str]]:
+        """(run ending at the last submitted day, longest run, last submitted day)."""
+        run = longest = 0
+        for score in self.scores:
+            run = run + 1 if score != NO_SCORE else 0
+            longest = max(longest, run)
+        last = self.last_day()
+        return (run if last else 0), longest, (last.isoformat() if last else None)
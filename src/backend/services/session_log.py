@@ -0,0 +1,273 @@
+"""
+Session Log
+Append-only session store with an in-memory hash index and background compaction
+"""
+
+import contextlib
+import copy
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from src.backend.services.persistence import FileLock, atomic_write_bytes
+from src.backend.services.storage import Collection, UpdateFn
+
+
+class SessionLog(Collection):
+    """
+    Sessions as a log of `put` / `del` records (one JSON object per line).
+
+    Creating or revoking a session appends one line instead of rewriting the
+    whole store. Every process keeps an index of live tokens and tails the log
+    for records appended by other workers. Compaction rewrites the log as one
+    `put` per live, unexpired session and atomically renames it into place;
+    readers notice the new inode and reload.
+    """
+
+    def __init__(self, path: str, legacy_json: Optional[str] = None, compact_interval: Optional[float] = None):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.legacy_json = legacy_json
+        self.compact_interval = compact_interval if compact_interval is not None else float(
+            os.getenv("SESSION_COMPACT_INTERVAL", "300")
+        )
+        self._lock = threading.RLock()
+        self._index: Dict[str, Any] = {}
+        self._ino: Optional[int] = None
+        self._offset = 0
+        self._records = 0  # lines in the current log file, live or not
+        self._memory = False
+        self._compactor: Optional[threading.Thread] = None
+        self._flock = FileLock(self.lock_path)
+        self.hits = 0
+        self.misses = 0
+
+    # -- file plumbing -------------------------------------------------
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive across threads and (where flock exists) across processes."""
+        with self._lock:
+            if self._memory:
+                yield
+                return
+            with self._flock:
+                yield
+
+    def _apply(self, line: bytes):
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            return
+        op, key = rec.get('op'), rec.get('k')
+        if not key:
+            return
+        if op == 'put':
+            self._index[key] = rec.get('v')
+        elif op == 'del':
+            self._index.pop(key, None)
+        self._records += 1
+
+    def _seed_from_legacy(self):
+        """First run after upgrade: carry over sessions.json into a fresh log."""
+        records: Dict[str, Any] = {}
+        if self.legacy_json and os.path.exists(self.legacy_json):
+            try:
+                with open(self.legacy_json, 'r') as f:
+                    records = json.load(f) or {}
+            except (json.JSONDecodeError, PermissionError) as e:
+                print(f"SessionLog - could not import {self.legacy_json}: {e}")
+        self._rewrite(records)
+        if records:
+            print(f"SessionLog - imported {len(records)} sessions from {self.legacy_json}")
+
+    def _refresh(self):
+        """Bring the index up to date with the file (cheap stat when nothing changed)."""
+        if self._memory:
+            self.hits += 1
+            return
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            with self._file_lock():
+                if not os.path.exists(self.path):
+                    self._seed_from_legacy()
+            if self._memory:
+                return
+            st = os.stat(self.path)
+        if st.st_ino != self._ino or st.st_size < self._offset:
+            self._index, self._offset, self._records = {}, 0, 0
+            self._ino = st.st_ino
+        if st.st_size == self._offset:
+            self.hits += 1
+            return
+        self.misses += 1
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        end = chunk.rfind(b'\n')
+        if end < 0:
+            return
+        for line in chunk[:end].split(b'\n'):
+            if line:
+                self._apply(line)
+        self._offset += end + 1
+
+    def _append(self, records):
+        """Append encoded records while holding the file lock; index is updated by replay."""
+        data = b''.join(json.dumps(r, separators=(',', ':')).encode('utf-8') + b'\n' for r in records)
+        if self._memory:
+            for r in records:
+                self._apply(json.dumps(r).encode('utf-8'))
+            return
+        try:
+            with open(self.path, 'ab') as f:
+                f.write(data)
+        except PermissionError:
+            # Read-only volume: keep serving sessions from memory
+            self._memory = True
+            for r in records:
+                self._apply(json.dumps(r).encode('utf-8'))
+            return
+        self._refresh()
+        self._ensure_compactor()
+
+    def _rewrite(self, live: Dict[str, Any]):
+        """Replace the log with one put per live session (caller holds the file lock)."""
+        data = b''.join(
+            json.dumps({'op': 'put', 'k': key, 'v': value}, separators=(',', ':')).encode('utf-8') + b'\n'
+            for key, value in live.items()
+        )
+        try:
+            atomic_write_bytes(self.path, data)
+        except PermissionError:
+            self._memory = True
+            self._index = dict(live)
+            self._records = len(live)
+            return
+        self._index, self._offset, self._records, self._ino = {}, 0, 0, None
+        self._refresh()
+
+    # -- compaction ----------------------------------------------------
+
+    @staticmethod
+    def _expired(value: Any, now: datetime) -> bool:
+        try:
+            return datetime.fromisoformat(value['expires_at']) <= now
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def needs_compaction(self) -> bool:
+        return self._records > 2 * len(self._index) + 64
+
+    def compact(self, force: bool = False) -> int:
+        """Rewrite the log without revoked or expired sessions. Returns entries reclaimed."""
+        with self._file_lock():
+            self._refresh()
+            if self._memory:
+                return 0
+            if not force and not self.needs_compaction():
+                return 0
+            now = datetime.now()
+            live = {k: v for k, v in self._index.items() if not self._expired(v, now)}
+            reclaimed = self._records - len(live)
+            self._rewrite(live)
+            return reclaimed
+
+    def sweep_expired(self) -> int:
+        """Drop expired sessions in one rewrite (which also compacts). Returns sessions removed."""
+        with self._file_lock():
+            self._refresh()
+            now = datetime.now()
+            live = {k: v for k, v in self._index.items() if not self._expired(v, now)}
+            removed = len(self._index) - len(live)
+            if not removed:
+                return 0
+            if self._memory:
+                self._index = live
+                self._records = len(live)
+            else:
+                self._rewrite(live)
+            return removed
+
+    def _ensure_compactor(self):
+        if self._compactor is not None or self.compact_interval <= 0:
+            return
+        self._compactor = threading.Thread(target=self._compact_loop, name="session-log-compactor", daemon=True)
+        self._compactor.start()
+
+    def _compact_loop(self):
+        while True:
+            time.sleep(self.compact_interval)
+            try:
+                reclaimed = self.compact()
+                if reclaimed:
+                    print(f"SessionLog - compacted {self.path}, reclaimed {reclaimed} records")
+            except Exception as e:
+                print(f"SessionLog - compaction failed: {e}")
+
+    # -- Collection API ------------------------------------------------
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            self._refresh()
+            return self._index.get(key)
+
+    def put(self, key: str, value: Any):
+        with self._file_lock():
+            self._refresh()
+            self._append([{'op': 'put', 'k': key, 'v': value}])
+
+    def delete(self, key: str) -> bool:
+        with self._file_lock():
+            self._refresh()
+            if key not in self._index:
+                return False
+            self._append([{'op': 'del', 'k': key}])
+            return True
+
+    def delete_many(self, keys) -> int:
+        with self._file_lock():
+            self._refresh()
+            present = [k for k in dict.fromkeys(keys) if k in self._index]
+            if present:
+                self._append([{'op': 'del', 'k': k} for k in present])
+            return len(present)
+
+    def update(self, key: str, fn: UpdateFn) -> Any:
+        with self._file_lock():
+            self._refresh()
+            new_value, result = fn(copy.deepcopy(self._index.get(key)))
+            if new_value is not None:
+                self._append([{'op': 'put', 'k': key, 'v': new_value}])
+            return result
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return iter(list(self._index.items()))
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    def load_all(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(self._index)
+
+    def save_all(self, records: Dict[str, Any]):
+        """Legacy whole-dict save: appended as the difference from the current index."""
+        with self._file_lock():
+            self._refresh()
+            ops = [{'op': 'del', 'k': k} for k in self._index if k not in records]
+            ops += [{'op': 'put', 'k': k, 'v': v} for k, v in records.items() if self._index.get(k) != v]
+            if ops:
+                self._append(ops)
+
+    def cache_stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
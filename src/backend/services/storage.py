@@ -0,0 +1,796 @@
+"""
+Storage Engines for Stanzle Services
+Pluggable key/value collections backed by JSON files, SQLite or process memory
+"""
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.backend.services.persistence import FileLock, GroupCommitter, atomic_write_bytes, atomic_write_json, read_json
+
+# update() callbacks receive the current record (None if missing) and return
+# (new_record, result). Returning None as the new record leaves storage untouched.
+UpdateFn = Callable[[Optional[Any]], Tuple[Optional[Any], Any]]
+
+
+class Collection:
+    """A named mapping of string keys to JSON-serializable records."""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def put(self, key: str, value: Any):
+        raise NotImplementedError
+
+    def delete(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def update(self, key: str, fn: UpdateFn) -> Any:
+        """Atomic read-modify-write of a single record."""
+        raise NotImplementedError
+
+    def delete_many(self, keys: List[str]) -> int:
+        """Delete several records; returns how many existed."""
+        return sum(1 for key in keys if self.delete(key))
+
+    def add_many(self, records: Dict[str, Any]) -> List[str]:
+        """Insert the records whose keys are absent (existing ones win); returns the keys added."""
+        added = []
+        for key, value in records.items():
+            def _add(current, value=value):
+                return (value, True) if current is None else (None, False)
+
+            if self.update(key, _add):
+                added.append(key)
+        return added
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def load_all(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def save_all(self, records: Dict[str, Any]):
+        raise NotImplementedError
+
+    def contains(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def keys(self) -> List[str]:
+        return [k for k, _ in self.items()]
+
+    def values(self) -> Iterator[Any]:
+        for _, v in self.items():
+            yield v
+
+    def version(self) -> Optional[str]:
+        """
+        Opaque token that changes whenever any record does (for ETags and caches);
+        None when this backend cannot tell cheaply, in which case nothing may be reused.
+        """
+        return None
+
+
+class MemoryCollection(Collection):
+    """Dict-backed collection for serverless hosts without a writable disk."""
+
+    def __init__(self, records: Optional[Dict[str, Any]] = None):
+        self._records: Dict[str, Any] = records if records is not None else {}
+        self._lock = threading.RLock()
+        # Random per instance: another process's memory store must never share a version
+        self._instance = os.urandom(4).hex()
+        self._generation = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._records.get(key)
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            self._records[key] = value
+            self._generation += 1
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            self._generation += 1
+            return self._records.pop(key, None) is not None
+
+    def update(self, key: str, fn: UpdateFn) -> Any:
+        with self._lock:
+            current = copy.deepcopy(self._records.get(key))
+            new_value, result = fn(current)
+            if new_value is not None:
+                self._records[key] = new_value
+                self._generation += 1
+            return result
+
+    def add_many(self, records: Dict[str, Any]) -> List[str]:
+        with self._lock:
+            added = [key for key in records if key not in self._records]
+            for key in added:
+                self._records[key] = records[key]
+            if added:
+                self._generation += 1
+            return added
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return iter(list(self._records.items()))
+
+    def count(self) -> int:
+        return len(self._records)
+
+    def load_all(self) -> Dict[str, Any]:
+        # Snapshot: put/delete change _records in place while callers iterate
+        return dict(self._records)
+
+    def save_all(self, records: Dict[str, Any]):
+        with self._lock:
+            self._records = records
+            self._generation += 1
+
+    def version(self) -> Optional[str]:
+        return f"{self._instance}-{self._generation}"
+
+
+class JsonCollection(Collection):
+    """Whole-file JSON collection (the original users.json / sessions.json format)."""
+
+    # A file modified this close to our read may change again within the same
+    # mtime tick without the stat signature moving (git's "racily clean" case).
+    _RACY_NS = 50_000_000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._memory: Optional[Dict[str, Any]] = None
+        # Concurrent writers share one load + one atomic write per batch; the
+        # file lock serializes batches across worker processes on the same volume
+        self._file_lock = FileLock(f"{path}.lock")
+        self._committer = GroupCommitter(self._load_for_write, self._write, lock=self._file_lock)
+        # Parsed-file cache, valid while (inode, mtime_ns, size) is unchanged
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_sig: Optional[Tuple[int, int, int]] = None
+        self.hits = 0
+        self.misses = 0
+        self._instance = os.urandom(4).hex()
+        self._generation = 0
+
+    @property
+    def is_memory(self) -> bool:
+        return self._memory is not None
+
+    def _stat_sig(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _remember(self, records: Dict[str, Any], sig: Optional[Tuple[int, int, int]], read_started_ns: int):
+        if sig is not None and sig[1] < read_started_ns - self._RACY_NS:
+            self._cache, self._cache_sig = records, sig
+        else:
+            # Too fresh to trust the signature; parse again next time
+            self._cache, self._cache_sig = None, None
+
+    def _read(self) -> Dict[str, Any]:
+        """Lock-free read: the cache is trusted whenever the signature matches."""
+        if self._memory is not None:
+            return self._memory
+        sig = self._stat_sig()
+        if sig is not None and sig == self._cache_sig:
+            self.hits += 1
+            return self._cache
+        return self._parse(sig)
+
+    def _load_for_write(self) -> Dict[str, Any]:
+        """
+        Read under the file lock for a commit batch. The cache is only reused once its
+        mtime is outside the racy window: a reused inode plus a same-tick write could
+        otherwise present our own old signature, and the batch would drop others' updates.
+
+        The batch always gets its own dict: lock-free readers may be iterating the
+        published one, and _write only swaps it in once the batch is on disk.
+        """
+        if self._memory is not None:
+            return dict(self._memory)
+        sig = self._stat_sig()
+        if sig is not None and sig == self._cache_sig and sig[1] < time.time_ns() - self._RACY_NS:
+            self.hits += 1
+            return dict(self._cache)
+        return dict(self._parse(sig))
+
+    def _parse(self, sig: Optional[Tuple[int, int, int]]) -> Dict[str, Any]:
+        self.misses += 1
+        started = time.time_ns()
+        try:
+            records = read_json(self.path, default={})
+        except PermissionError as e:
+            print(f"🔍 JsonCollection - read {self.path}: file error = {e}")
+            return {}
+        self._remember(records, sig, started)
+        return records
+
+    def _write(self, records: Dict[str, Any]):
+        if self._memory is not None:
+            self._memory = records
+            self._generation += 1
+            return
+        try:
+            atomic_write_json(self.path, records)
+            # Lock-free reads may use our own write straight away; the next commit batch
+            # re-checks it against the racy window (see _load_for_write)
+            sig = self._stat_sig()
+            self._cache, self._cache_sig = (records, sig) if sig is not None else (None, None)
+        except PermissionError:
+            # Fallback to memory storage
+            self._memory = records
+            self._generation += 1
+        # Any other failure propagates with the previous cache still published: the
+        # batch's dict was private, so readers keep serving what is on disk
+
+    def cache_stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'commit_batches': self._committer.batches,
+            'commit_mutations': self._committer.mutations,
+            'lock_waits': self._file_lock.waits,
+        }
+
+    def version(self) -> Optional[str]:
+        if self._memory is not None:
+            return f"{self._instance}-{self._generation}"
+        sig = self._stat_sig()
+        # Same racily-clean rule as the parse cache: a file written this recently
+        # could change again without its signature moving
+        if sig is None or sig[1] >= time.time_ns() - self._RACY_NS:
+            return None
+        return "{:x}-{:x}-{:x}".format(*sig)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._read().get(key)
+
+    def put(self, key: str, value: Any):
+        def _put(records):
+            records[key] = value
+            return True, None
+
+        self._committer.submit(_put)
+
+    def delete(self, key: str) -> bool:
+        def _delete(records):
+            if key not in records:
+                return False, False
+            del records[key]
+            return True, True
+
+        return self._committer.submit(_delete)
+
+    def delete_many(self, keys: List[str]) -> int:
+        def _delete_many(records):
+            removed = 0
+            for key in keys:
+                if records.pop(key, None) is not None:
+                    removed += 1
+            return removed > 0, removed
+
+        return self._committer.submit(_delete_many)
+
+    def add_many(self, records: Dict[str, Any]) -> List[str]:
+        def _add_many(current):
+            added = [key for key in records if key not in current]
+            for key in added:
+                current[key] = records[key]
+            return bool(added), added
+
+        return self._committer.submit(_add_many)
+
+    def update(self, key: str, fn: UpdateFn) -> Any:
+        def _update(records):
+            new_value, result = fn(copy.deepcopy(records.get(key)))
+            if new_value is None:
+                return False, result
+            records[key] = new_value
+            return True, result
+
+        return self._committer.submit(_update)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return iter(list(self._read().items()))
+
+    def count(self) -> int:
+        return len(self._read())
+
+    def load_all(self) -> Dict[str, Any]:
+        return self._read()
+
+    def save_all(self, records: Dict[str, Any]):
+        def _replace(current):
+            current.clear()
+            current.update(records)
+            return True, None
+
+        self._committer.submit(_replace)
+
+
+class SqliteCollection(Collection):
+    """One collection inside the shared SQLite `records` table; every op touches one row."""
+
+    def __init__(self, engine: "SqliteEngine", name: str):
+        self._engine = engine
+        self.name = name
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._engine.conn().execute(
+            "SELECT data FROM records WHERE collection = ? AND key = ?", (self.name, key)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, value: Any):
+        self._engine.conn().execute(
+            "INSERT OR REPLACE INTO records (collection, key, data) VALUES (?, ?, ?)",
+            (self.name, key, json.dumps(value)),
+        )
+
+    def delete(self, key: str) -> bool:
+        cur = self._engine.conn().execute(
+            "DELETE FROM records WHERE collection = ? AND key = ?", (self.name, key)
+        )
+        return cur.rowcount > 0
+
+    def delete_many(self, keys: List[str]) -> int:
+        with self._engine.transaction() as conn:
+            removed = 0
+            for key in keys:
+                removed += conn.execute(
+                    "DELETE FROM records WHERE collection = ? AND key = ?", (self.name, key)
+                ).rowcount
+            return removed
+
+    def add_many(self, records: Dict[str, Any]) -> List[str]:
+        with self._engine.transaction() as conn:
+            added = []
+            for key, value in records.items():
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO records (collection, key, data) VALUES (?, ?, ?)",
+                    (self.name, key, json.dumps(value)),
+                )
+                if cur.rowcount:
+                    added.append(key)
+            return added
+
+    def update(self, key: str, fn: UpdateFn) -> Any:
+        with self._engine.transaction() as conn:
+            row = conn.execute(
+                "SELECT data FROM records WHERE collection = ? AND key = ?", (self.name, key)
+            ).fetchone()
+            new_value, result = fn(json.loads(row[0]) if row else None)
+            if new_value is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO records (collection, key, data) VALUES (?, ?, ?)",
+                    (self.name, key, json.dumps(new_value)),
+                )
+            return result
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        cur = self._engine.conn().execute(
+            "SELECT key, data FROM records WHERE collection = ? ORDER BY rowid", (self.name,)
+        )
+        for key, data in cur:
+            yield key, json.loads(data)
+
+    def keys(self) -> List[str]:
+        cur = self._engine.conn().execute(
+            "SELECT key FROM records WHERE collection = ? ORDER BY rowid", (self.name,)
+        )
+        return [row[0] for row in cur]
+
+    def count(self) -> int:
+        row = self._engine.conn().execute(
+            "SELECT COUNT(*) FROM records WHERE collection = ?", (self.name,)
+        ).fetchone()
+        return int(row[0])
+
+    def contains(self, key: str) -> bool:
+        row = self._engine.conn().execute(
+            "SELECT 1 FROM records WHERE collection = ? AND key = ?", (self.name, key)
+        ).fetchone()
+        return row is not None
+
+    def save_all(self, records: Dict[str, Any]):
+        with self._engine.transaction() as conn:
+            conn.execute("DELETE FROM records WHERE collection = ?", (self.name,))
+            conn.executemany(
+                "INSERT INTO records (collection, key, data) VALUES (?, ?, ?)",
+                [(self.name, k, json.dumps(v)) for k, v in records.items()],
+            )
+
+
+class AppendLog:
+    """
+    Append-ordered records, read newest-first in pages.
+
+    Cursors are opaque strings: pass the `next_cursor` of one page as `before`
+    to get the next (older) page; None means there is nothing older.
+    """
+
+    def append(self, record: Any):
+        raise NotImplementedError
+
+    def scan_reverse(self, before: Optional[str] = None, limit: int = 100) -> Tuple[List[Any], Optional[str]]:
+        raise NotImplementedError
+
+    def replace(self, records: List[Any]):
+        """Rewrite the whole log, oldest record first (rebuilds and backfills)."""
+        raise NotImplementedError
+
+
+class MemoryLog(AppendLog):
+    def __init__(self):
+        self._records: List[Any] = []
+        self._lock = threading.Lock()
+
+    def append(self, record: Any):
+        with self._lock:
+            self._records.append(record)
+
+    def scan_reverse(self, before: Optional[str] = None, limit: int = 100) -> Tuple[List[Any], Optional[str]]:
+        end = len(self._records) if before is None else min(int(before), len(self._records))
+        start = max(0, end - limit)
+        page = self._records[start:end][::-1]
+        return page, (str(start) if start > 0 else None)
+
+    def replace(self, records: List[Any]):
+        with self._lock:
+            self._records = list(records)
+
+
+class JsonlLog(AppendLog):
+    """One JSON object per line; appends are single O_APPEND writes, reads go backwards from a byte offset."""
+
+    _BLOCK = 64 * 1024
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file_lock = FileLock(f"{path}.lock")
+        self._memory: Optional[MemoryLog] = None
+
+    @property
+    def is_memory(self) -> bool:
+        return self._memory is not None
+
+    def append(self, record: Any):
+        if self._memory is not None:
+            return self._memory.append(record)
+        line = json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+        try:
+            with self._file_lock, open(self.path, 'a+b') as f:
+                # Never glue a record onto a line torn by a crash mid-append
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        line = b'\n' + line
+                f.write(line)
+        except PermissionError:
+            self._memory = MemoryLog()
+            self._memory.append(record)
+
+    def scan_reverse(self, before: Optional[str] = None, limit: int = 100) -> Tuple[List[Any], Optional[str]]:
+        if self._memory is not None:
+            return self._memory.scan_reverse(before, limit)
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return [], None
+        out: List[Any] = []
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            end = size if before is None else min(int(before), size)
+            chunk, chunk_start = b'', end
+            while len(out) < limit:
+                # Newline that terminates the line before the current last line
+                idx = chunk.rfind(b'\n', 0, max(len(chunk) - 1, 0))
+                while idx < 0 and chunk_start > 0:
+                    step = min(self._BLOCK, chunk_start)
+                    chunk_start -= step
+                    f.seek(chunk_start)
+                    chunk = f.read(step) + chunk
+                    idx = chunk.rfind(b'\n', 0, len(chunk) - 1)
+                if not chunk:
+                    break
+                line, chunk = chunk[idx + 1:], chunk[:idx + 1]
+                end = chunk_start + idx + 1
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    continue  # torn tail of an in-flight append
+        return out, (str(end) if end > 0 and len(out) >= limit else None)
+
+    def replace(self, records: List[Any]):
+        data = b''.join(json.dumps(r, separators=(',', ':')).encode('utf-8') + b'\n' for r in records)
+        with self._file_lock:
+            try:
+                atomic_write_bytes(self.path, data)
+            except PermissionError:
+                self._memory = MemoryLog()
+                self._memory.replace(records)
+
+
+class SqliteLog(AppendLog):
+    """Rows in the shared `logs` table; the autoincrement seq is both order and cursor."""
+
+    def __init__(self, engine: "SqliteEngine", name: str):
+        self._engine = engine
+        self.name = name
+
+    def append(self, record: Any):
+        self._engine.conn().execute(
+            "INSERT INTO logs (name, data) VALUES (?, ?)", (self.name, json.dumps(record))
+        )
+
+    def scan_reverse(self, before: Optional[str] = None, limit: int = 100) -> Tuple[List[Any], Optional[str]]:
+        # One extra row tells whether anything older exists, so an exactly full last page gets no cursor
+        if before is None:
+            rows = self._engine.conn().execute(
+                "SELECT seq, data FROM logs WHERE name = ? ORDER BY seq DESC LIMIT ?", (self.name, limit + 1)
+            ).fetchall()
+        else:
+            rows = self._engine.conn().execute(
+                "SELECT seq, data FROM logs WHERE name = ? AND seq < ? ORDER BY seq DESC LIMIT ?",
+                (self.name, int(before), limit + 1),
+            ).fetchall()
+        more, rows = len(rows) > limit, rows[:limit]
+        page = [json.loads(data) for _, data in rows]
+        return page, (str(rows[-1][0]) if more and rows else None)
+
+    def replace(self, records: List[Any]):
+        with self._engine.transaction() as conn:
+            conn.execute("DELETE FROM logs WHERE name = ?", (self.name,))
+            conn.executemany(
+                "INSERT INTO logs (name, data) VALUES (?, ?)", [(self.name, json.dumps(r)) for r in records]
+            )
+
+
+class StorageEngine:
+    """Factory for named collections and append logs."""
+
+    is_memory = False
+
+    def collection(self, name: str) -> Collection:
+        raise NotImplementedError
+
+    def log(self, name: str) -> AppendLog:
+        raise NotImplementedError
+
+    def collection_names(self, prefix: str) -> List[str]:
+        """Names of existing collections starting with `prefix` (e.g. 'submissions/')."""
+        raise NotImplementedError
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-collection read-cache hit/miss counters (engines without a cache report none)."""
+        return {}
+
+
+class MemoryEngine(StorageEngine):
+    is_memory = True
+
+    def __init__(self):
+        self._collections: Dict[str, MemoryCollection] = {}
+        self._logs: Dict[str, MemoryLog] = {}
+
+    def collection(self, name: str) -> Collection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection()
+        return self._collections[name]
+
+    def log(self, name: str) -> AppendLog:
+        if name not in self._logs:
+            self._logs[name] = MemoryLog()
+        return self._logs[name]
+
+    def collection_names(self, prefix: str) -> List[str]:
+        return sorted(n for n, c in self._collections.items() if n.startswith(prefix) and c.count())
+
+
+class JsonEngine(StorageEngine):
+    """One `<name>.json` file per collection under data_dir ('a/b' lives in data_dir/a/b.json)."""
+
+    # Partitions ('submissions/<day>', and logs like 'history/<user>') are opened on demand and
+    # only the most recently used stay cached; top-level collections and logs stay open
+    _PARTITION_CACHE_SIZE = 8
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self._collections: Dict[str, JsonCollection] = {}
+        self._partitions: "OrderedDict[str, JsonCollection]" = OrderedDict()
+        self._logs: Dict[str, JsonlLog] = {}
+        self._partition_logs: "OrderedDict[str, JsonlLog]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def collection(self, name: str) -> Collection:
+        with self._lock:
+            if '/' not in name:
+                if name not in self._collections:
+                    self._collections[name] = JsonCollection(os.path.join(self.data_dir, f"{name}.json"))
+                return self._collections[name]
+            if name in self._partitions:
+                self._partitions.move_to_end(name)
+                return self._partitions[name]
+            path = os.path.join(self.data_dir, *f"{name}.json".split('/'))
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            except PermissionError:
+                pass
+            partition = self._partitions[name] = JsonCollection(path)
+            self._evict_partitions()
+            return partition
+
+    def _evict_partitions(self):
+        # Evicted instances still in use keep working: the file lock, not the
+        # instance, serializes writers. Memory fallbacks hold the only copy, so stay.
+        for name in list(self._partitions):
+            if len(self._partitions) <= self._PARTITION_CACHE_SIZE:
+                break
+            if not self._partitions[name].is_memory:
+                del self._partitions[name]
+
+    def log(self, name: str) -> AppendLog:
+        with self._lock:
+            if '/' not in name:
+                if name not in self._logs:
+                    self._logs[name] = JsonlLog(os.path.join(self.data_dir, f"{name}.jsonl"))
+                return self._logs[name]
+            if name in self._partition_logs:
+                self._partition_logs.move_to_end(name)
+                return self._partition_logs[name]
+            path = os.path.join(self.data_dir, *f"{name}.jsonl".split('/'))
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            except PermissionError:
+                pass
+            log = self._partition_logs[name] = JsonlLog(path)
+            # Same rule as _evict_partitions: the file lock serializes appends, memory fallbacks stay
+            for cached in list(self._partition_logs):
+                if len(self._partition_logs) <= self._PARTITION_CACHE_SIZE:
+                    break
+                if not self._partition_logs[cached].is_memory:
+                    del self._partition_logs[cached]
+            return log
+
+    def collection_names(self, prefix: str) -> List[str]:
+        directory, _, stem = prefix.rpartition('/')
+        try:
+            entries = os.listdir(os.path.join(self.data_dir, *directory.split('/')) if directory else self.data_dir)
+        except FileNotFoundError:
+            entries = []
+        names = {
+            f"{directory}/{e[:-5]}" if directory else e[:-5]
+            for e in entries
+            if e.endswith('.json') and e.startswith(stem)
+        }
+        # Collections that only exist in memory (read-only volume fallback)
+        with self._lock:
+            opened = list(self._collections.items()) + list(self._partitions.items())
+        names.update(n for n, c in opened if n.startswith(prefix) and c.is_memory)
+        return sorted(names)
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: c.cache_stats() for name, c in self._collections.items()}
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        # IMMEDIATE takes the write lock up front so concurrent writers queue on
+        # busy_timeout instead of failing with SQLITE_BUSY on upgrade.
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._conn.execute("COMMIT")
+        else:
+            self._conn.execute("ROLLBACK")
+        return False
+
+
+class SqliteEngine(StorageEngine):
+    """SQLite in WAL mode; one connection per thread, rows keyed by (collection, key)."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        conn = self.conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " collection TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " data TEXT NOT NULL,"
+            " PRIMARY KEY (collection, key))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS logs ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " name TEXT NOT NULL,"
+            " data TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS logs_name_seq ON logs (name, seq)")
+
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def transaction(self) -> _Transaction:
+        return _Transaction(self.conn())
+
+    def collection(self, name: str) -> Collection:
+        return SqliteCollection(self, name)
+
+    def log(self, name: str) -> AppendLog:
+        return SqliteLog(self, name)
+
+    def collection_names(self, prefix: str) -> List[str]:
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        cur = self.conn().execute(
+            "SELECT DISTINCT collection FROM records WHERE collection LIKE ? ESCAPE '\\' ORDER BY collection",
+            (escaped + '%',),
+        )
+        return [row[0] for row in cur]
+
+
+def open_engine(data_dir: str, backend: Optional[str] = None) -> StorageEngine:
+    """
+    Build the engine named by `backend` or STORAGE_BACKEND ('json' default, 'sqlite', 'memory').
+    Falls back to memory when data_dir cannot be created (read-only serverless hosts).
+    """
+    backend = (backend or os.getenv("STORAGE_BACKEND", "json")).strip().lower()
+    if backend == "memory":
+        return MemoryEngine()
+    try:
+        os.makedirs(data_dir, exist_ok=True)
+    except PermissionError:
+        return MemoryEngine()
+    if backend == "sqlite":
+        db_path = os.getenv("SQLITE_PATH") or os.path.join(data_dir, "stanzle.db")
+        return SqliteEngine(db_path)
+    return JsonEngine(data_dir)
+
+
+def import_json_collection(engine: StorageEngine, name: str, json_path: str, force: bool = False) -> int:
+    """
+    Import of a legacy whole-file JSON dict (users.json, sessions.json) into `engine`.
+    Skips non-empty targets unless force=True; a missing file is nothing to import.
+    Returns the number of records imported. Callers record that the import ran (see
+    AuthService._import_legacy_json) so it is never repeated.
+    """
+    target = engine.collection(name)
+    if not force and target.count() > 0:
+        return 0
+    try:
+        with open(json_path, 'r') as f:
+            records = json.load(f)
+    except FileNotFoundError:
+        return 0
+    except json.JSONDecodeError as e:
+        print(f"Import of {json_path} skipped: {e}")
+        return 0
+    if not isinstance(records, dict) or not records:
+        return 0
+    target.save_all(records)
+    return len(records)
@@ -0,0 +1,84 @@
+"""
+Token Cache
+Bounded, short-lived memo of verified session tokens so authenticated requests skip storage
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+
+class TokenCache:
+    """
+    LRU of token -> (user summary, monotonic deadline).
+
+    An entry lives at most `ttl` seconds and never past the session's own expiry.
+    Logout drops the token; writes to a user drop every token cached for that user.
+    Other worker processes are not notified, so `ttl` bounds how long they may
+    keep honouring a token revoked elsewhere.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_size: Optional[int] = None):
+        self.ttl = ttl if ttl is not None else float(os.getenv("TOKEN_CACHE_TTL", "30"))
+        self.max_size = max_size if max_size is not None else int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            summary, deadline = entry
+            if time.monotonic() >= deadline:
+                self._drop(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return dict(summary)
+
+    def put(self, token: str, summary: Dict[str, Any], session_seconds_left: float):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        deadline = time.monotonic() + min(self.ttl, max(session_seconds_left, 0.0))
+        with self._lock:
+            self._drop(token)
+            self._entries[token] = (dict(summary), deadline)
+            self._by_user.setdefault(summary['username'], set()).add(token)
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_token(self, token: str):
+        with self._lock:
+            self._drop(token)
+
+    def invalidate_user(self, username: str):
+        with self._lock:
+            for token in list(self._by_user.get(username, ())):
+                self._drop(token)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+    def _drop(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        username = entry[0]['username']
+        tokens = self._by_user.get(username)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_user[username]
@@ -16,6 +16,13 @@ class WordnikService:
     # (connect, read) — fail fast on dead routes; read cap avoids hanging workers
     _REQUEST_TIMEOUT = (2.5, 8.0)
 
+    # Scheduled challenges avoid repeating a pick from this many preceding days
+    # (bounded by the list sizes: 21 themes, 19 emotions, 10 word sets)
+    SCHEDULE_THEME_GAP = 14
+    SCHEDULE_EMOTION_GAP = 14
+    SCHEDULE_WORDS_GAP = 6
+    SCHEDULE_PAIR_GAP = 365
+
     def __init__(self):
         self.api_key = os.getenv('WORDNIK_API_KEY')
         # HTTPS avoids http→https redirect latency on every cold connection
@@ -108,21 +115,23 @@ class WordnikService:
         ]
         return random.choice(fallback_words)
 
+    # Word sets for daily challenges (seeded picks and schedules)
+    _FALLBACK_WORD_SETS = [
+        ['mountain', 'journey', 'discover', 'freedom'],
+        ['heart', 'soul', 'passion', 'forever'],
+        ['tree', 'wind', 'ocean', 'sky'],
+        ['sleep', 'dream', 'reality', 'awake'],
+        ['clock', 'moment', 'eternity', 'now'],
+        ['light', 'dark', 'shine', 'bright'],
+        ['tear', 'smile', 'memory', 'goodbye'],
+        ['bird', 'cage', 'fly', 'free'],
+        ['river', 'stone', 'whisper', 'dance'],
+        ['shadow', 'light', 'breath', 'song']
+    ]
+
     def _deterministic_fallback_words(self, rng: random.Random) -> List[str]:
         """Pick a stable fallback word set for a seeded RNG."""
-        fallback_words = [
-            ['mountain', 'journey', 'discover', 'freedom'],
-            ['heart', 'soul', 'passion', 'forever'],
-            ['tree', 'wind', 'ocean', 'sky'],
-            ['sleep', 'dream', 'reality', 'awake'],
-            ['clock', 'moment', 'eternity', 'now'],
-            ['light', 'dark', 'shine', 'bright'],
-            ['tear', 'smile', 'memory', 'goodbye'],
-            ['bird', 'cage', 'fly', 'free'],
-            ['river', 'stone', 'whisper', 'dance'],
-            ['shadow', 'light', 'breath', 'song']
-        ]
-        return list(rng.choice(fallback_words))
+        return list(rng.choice(self._FALLBACK_WORD_SETS))
 
     def get_random_theme(self) -> str:
         """Get a random theme"""
@@ -177,6 +186,59 @@ class WordnikService:
             'emotion': emotion
         }
 
+    def generate_challenge_schedule(self, dates: List[str], existing: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Challenges for `dates` (YYYY-MM-DD) that repeat no theme, emotion or word set from the
+        preceding days (see SCHEDULE_*_GAP) and reuse a theme+emotion pairing only when every
+        allowed pairing was used within the past year, picking the one used longest ago. `existing` maps dates to challenges
+        already stored; they stay as they are and count as history. Picks are seeded by date,
+        so planning the same dates against the same history gives the same schedule.
+        """
+        targets = set(dates) - set(existing)
+        recent: List[Dict[str, Any]] = []
+        plan: Dict[str, Dict[str, Any]] = {}
+        for day in sorted(targets | set(existing)):
+            if day in targets:
+                plan[day] = self._plan_challenge(day, recent)
+                recent.append(plan[day])
+            else:
+                recent.append(existing[day])
+        return plan
+
+    def _plan_challenge(self, day: str, recent: List[Dict[str, Any]]) -> Dict[str, Any]:
+        seed_hex = hashlib.sha256(f"schedule:{day}".encode("utf-8")).hexdigest()[:16]
+        rng = random.Random(int(seed_hex, 16))
+
+        def _recent(field: str, gap: int) -> set:
+            return {str(c.get(field, '')).lower() for c in recent[-gap:]}
+
+        used_themes = _recent('theme', self.SCHEDULE_THEME_GAP)
+        used_emotions = _recent('emotion', self.SCHEDULE_EMOTION_GAP)
+        used_words = {tuple(w.lower() for w in c.get('words', [])) for c in recent[-self.SCHEDULE_WORDS_GAP:]}
+        # Pairing -> how recently it was used (higher = more recent)
+        pair_last_used = {
+            (str(c.get('theme', '')).lower(), str(c.get('emotion', '')).lower()): i
+            for i, c in enumerate(recent[-self.SCHEDULE_PAIR_GAP:])
+        }
+
+        themes = rng.sample(self.theme_words, len(self.theme_words))
+        emotions = rng.sample(self.emotion_words, len(self.emotion_words))
+        themes = [t for t in themes if t not in used_themes] or themes
+        emotions = [e for e in emotions if e not in used_emotions] or emotions
+        # An unused pairing if any, else the one used longest ago ("peace"/"hope" are on both lists;
+        # never pair a word with itself)
+        pairs = [(t, e) for t in themes for e in emotions if t != e]
+        theme, emotion = min(pairs, key=lambda p: pair_last_used.get(p, -1))
+
+        word_sets = rng.sample(self._FALLBACK_WORD_SETS, len(self._FALLBACK_WORD_SETS))
+        words = next((w for w in word_sets if tuple(w) not in used_words), word_sets[0])
+
+        return {
+            'words': list(words),
+            'theme': theme.title(),
+            'emotion': emotion.title()
+        }
+
     def generate_unlimited_challenge(self) -> Dict[str, Any]:
         """Generate a fresh random challenge for unlimited mode."""
         words = self.get_random_words(4)
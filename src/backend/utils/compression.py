@@ -0,0 +1,84 @@
+"""
+Compression utilities for the Stanzle application
+gzip (and brotli when the `brotli` package is installed) for JSON responses and static files
+"""
+
+import gzip
+import os
+from typing import Iterable, Optional
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip alone is always available
+    brotli = None
+
+# Preferred first; `br` only when the module is importable
+SUPPORTED_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+# File suffix of a precompressed sibling (public/assets/app.js -> app.js.br / app.js.gz)
+ENCODING_SUFFIX = {'br': '.br', 'gzip': '.gz'}
+
+# Tag appended inside a strong ETag so each encoding of a resource keeps a distinct validator
+ETAG_SUFFIX = {'br': '-br', 'gzip': '-gz'}
+
+# Text-like files worth precompressing at build time
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.html', '.svg', '.json', '.map', '.txt', '.xml', '.webmanifest')
+
+def min_compress_size() -> int:
+    """Bodies smaller than this (COMPRESS_MIN_SIZE bytes) are sent as-is"""
+    return int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+
+def compress(data: bytes, encoding: str, best: bool = False) -> bytes:
+    """
+    Compress `data`. Request-time callers use the default (cheap) levels;
+    build-time callers pass best=True since the result is reused forever.
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if best else 4)
+    if encoding == 'gzip':
+        # mtime=0 keeps output byte-identical across runs (stable ETags / diffs)
+        return gzip.compress(data, compresslevel=9 if best else 6, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+def negotiate(accept_encodings, available: Iterable[str] = SUPPORTED_ENCODINGS) -> Optional[str]:
+    """Best encoding the client accepts (werkzeug `request.accept_encodings`), or None for identity"""
+    available = list(available)
+    if not available:
+        return None
+    return accept_encodings.best_match(available)
+
+def init_compression(app, min_size: Optional[int] = None):
+    """
+    Compress buffered JSON responses of at least `min_size` bytes after the view runs.
+    Streamed and file responses, non-200s and already-encoded bodies are left alone.
+    """
+    threshold = min_size if min_size is not None else min_compress_size()
+
+    @app.after_request
+    def _compress_response(response):
+        if response.status_code == 304 or response.mimetype == 'application/json':
+            response.vary.add('Accept-Encoding')
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype != 'application/json'
+        ):
+            return response
+        data = response.get_data()
+        if len(data) < threshold:
+            return response
+        encoding = negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(etag + ETAG_SUFFIX[encoding], weak)
+        return response
+
+    return app
@@ -0,0 +1,23 @@
+"""
+HTTP caching utilities for the Stanzle application
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from src.backend.utils.compression import ETAG_SUFFIX
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag value (unquoted) for a resource identified by its data version parts"""
+    key = "\x1f".join(str(p) for p in parts)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+def matching_etag(if_none_match, etag: str) -> Optional[str]:
+    """
+    The variant of `etag` (bare or compressed, see compression.ETAG_SUFFIX) that If-None-Match names,
+    or None. A 304 must repeat that variant so the client's validator does not flip.
+    """
+    for suffix in ('',) + tuple(ETAG_SUFFIX.values()):
+        if if_none_match.contains_weak(etag + suffix):
+            return etag + suffix
+    return None
@@ -0,0 +1,30 @@
+"""
+Pagination utilities for the Stanzle application
+"""
+
+import base64
+from typing import Optional
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(position: Optional[str]) -> Optional[str]:
+    """Wrap an internal position (a date, a log offset) into an opaque URL-safe cursor"""
+    if position is None:
+        return None
+    return base64.urlsafe_b64encode(position.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: Optional[str]) -> Optional[str]:
+    """Inverse of encode_cursor; raises ValueError on a cursor we did not issue"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return base64.b64decode(padded, altchars=b'-_', validate=True).decode('utf-8')
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
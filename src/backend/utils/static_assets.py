@@ -0,0 +1,173 @@
+"""
+Static asset serving for the Stanzle application
+A startup manifest of public/ so requests never probe the filesystem to find a file
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from typing import Any, Dict, Optional, Set
+
+from flask import Response, request, send_file
+
+from src.backend.utils.compression import ENCODING_SUFFIX, ETAG_SUFFIX, SUPPORTED_ENCODINGS, compress, negotiate
+
+# Written by `vite build` (build.manifest) and copied here by scripts/build-spa.sh; lists every hashed output
+BUILD_MANIFEST = ".vite/manifest.json"
+
+# Fallback when no manifest was copied: Rollup's default [hash] is exactly 8 base64url characters
+# (assets/index-CscbdNN8.js). An all-lowercase word such as app-settings.js is not treated as one.
+_HASHED_NAME_RE = re.compile(r"-(?=[A-Za-z0-9_-]{0,7}[A-Z0-9_-])[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+SHELL = "index.html"
+
+class StaticAssets:
+    """
+    Serves public/ from a manifest built once at startup (restart after a new build).
+
+    - Content-hashed files under assets/ are sent with `Cache-Control: public, max-age=1y, immutable`;
+      everything else with `no-cache` and an ETag, so browsers revalidate.
+    - The SPA shell (index.html) is held in memory, precompressed, with a content ETag.
+    - STATIC_SENDFILE=x-accel (nginx, under STATIC_ACCEL_PREFIX) or x-sendfile (Apache/lighttpd)
+      hands the byte pushing to the fronting proxy; it should then do its own static compression.
+    """
+
+    def __init__(self, public_dir: str, sendfile: Optional[str] = None, accel_prefix: Optional[str] = None):
+        self.public_dir = os.path.abspath(public_dir)
+        self.sendfile = (sendfile if sendfile is not None else os.getenv("STATIC_SENDFILE", "")).strip().lower()
+        if self.sendfile not in ("", "x-accel", "x-sendfile"):
+            print(f"StaticAssets - unknown STATIC_SENDFILE={self.sendfile!r}; serving files directly")
+            self.sendfile = ""
+        self.accel_prefix = (accel_prefix if accel_prefix is not None else os.getenv("STATIC_ACCEL_PREFIX", "/_public")).rstrip("/")
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.shell: Optional[Dict[str, Any]] = None
+        self.reload()
+
+    def reload(self):
+        """Rebuild the manifest from disk (startup, or after replacing public/ in place)"""
+        files: Dict[str, Dict[str, Any]] = {}
+        compressed_suffixes = tuple(ENCODING_SUFFIX.values())
+        hashed = self._load_build_manifest()
+        for root, _, names in os.walk(self.public_dir):
+            for name in names:
+                if name.endswith(compressed_suffixes):
+                    continue
+                full_path = os.path.join(root, name)
+                rel_path = os.path.relpath(full_path, self.public_dir).replace(os.sep, "/")
+                if rel_path.startswith(".vite/"):
+                    continue
+                st = os.stat(full_path)
+                variants = {
+                    enc: rel_path + suffix for enc, suffix in ENCODING_SUFFIX.items()
+                    if os.path.isfile(full_path + suffix)
+                }
+                files[rel_path] = {
+                    "path": full_path,
+                    "mimetype": mimetypes.guess_type(name)[0] or "application/octet-stream",
+                    "etag": f"{st.st_mtime_ns:x}-{st.st_size:x}",
+                    "immutable": self._is_hashed(rel_path, name, hashed),
+                    "variants": variants,
+                }
+        self.files = files
+        self.shell = self._load_shell()
+
+    def _load_build_manifest(self) -> Optional[Set[str]]:
+        """Output paths named in Vite's build manifest, or None when it is missing or unreadable"""
+        path = os.path.join(self.public_dir, BUILD_MANIFEST)
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                chunks = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"StaticAssets - unreadable build manifest {path}: {e}")
+            return None
+        outputs: Set[str] = set()
+        for chunk in chunks.values():
+            outputs.add(chunk.get("file", ""))
+            outputs.update(chunk.get("css", []))
+            outputs.update(chunk.get("assets", []))
+        outputs.discard("")
+        return outputs
+
+    @staticmethod
+    def _is_hashed(rel_path: str, name: str, hashed: Optional[Set[str]]) -> bool:
+        if hashed is not None:
+            return rel_path in hashed
+        return rel_path.startswith("assets/") and bool(_HASHED_NAME_RE.search(name))
+
+    def _load_shell(self) -> Optional[Dict[str, Any]]:
+        entry = self.files.get(SHELL)
+        if entry is None:
+            return None
+        with open(entry["path"], "rb") as f:
+            body = f.read()
+        bodies = {None: body}
+        for encoding in SUPPORTED_ENCODINGS:
+            compressed = compress(body, encoding, best=True)
+            if len(compressed) < len(body):
+                bodies[encoding] = compressed
+        return {"bodies": bodies, "etag": hashlib.sha1(body).hexdigest()[:20], "mimetype": entry["mimetype"]}
+
+    def __contains__(self, rel_path: str) -> bool:
+        return rel_path in self.files
+
+    def send(self, rel_path: str) -> Response:
+        """Response for public/<rel_path>; the caller checks membership first"""
+        if rel_path == SHELL and self.shell is not None:
+            return self.send_shell()
+        entry = self.files[rel_path]
+        if self.sendfile:
+            response = self._send_via_proxy(rel_path, entry)
+        else:
+            encoding = negotiate(request.accept_encodings, entry["variants"])
+            path = entry["path"] + ENCODING_SUFFIX[encoding] if encoding else entry["path"]
+            etag = entry["etag"] + ETAG_SUFFIX[encoding] if encoding else entry["etag"]
+            response = send_file(path, mimetype=entry["mimetype"], etag=etag, conditional=True, max_age=None)
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+            if entry["variants"]:
+                response.vary.add("Accept-Encoding")
+        self._set_cache_control(response, entry["immutable"])
+        return response
+
+    def send_shell(self) -> Response:
+        """The SPA shell from memory (client-side routes, /, and 404s on GET)"""
+        if self.shell is None:
+            return Response("SPA build missing: run scripts/build-spa.sh", status=404, mimetype="text/plain")
+        encoding = negotiate(request.accept_encodings, [e for e in self.shell["bodies"] if e])
+        etag = self.shell["etag"] + ETAG_SUFFIX[encoding] if encoding else self.shell["etag"]
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = Response(self.shell["bodies"][encoding], mimetype=self.shell["mimetype"])
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+        response.set_etag(etag)
+        if len(self.shell["bodies"]) > 1:
+            response.vary.add("Accept-Encoding")
+        self._set_cache_control(response, immutable=False)
+        return response
+
+    def _send_via_proxy(self, rel_path: str, entry: Dict[str, Any]) -> Response:
+        response = Response(mimetype=entry["mimetype"])
+        if self.sendfile == "x-accel":
+            response.headers["X-Accel-Redirect"] = f"{self.accel_prefix}/{rel_path}"
+        else:
+            response.headers["X-Sendfile"] = entry["path"]
+        return response
+
+    @staticmethod
+    def _set_cache_control(response: Response, immutable: bool):
+        if immutable:
+            # send_file defaults to no-cache when not given a max_age
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
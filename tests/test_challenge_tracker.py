@@ -0,0 +1,129 @@
+"""
+Challenge tracker score stats tests
+"""
+
+import json
+import os
+import statistics
+import threading
+
+import pytest
+
+from src.backend.services.challenge_tracker import ChallengeTracker
+
+DAY = "2026-01-01"
+CHALLENGE = {"theme": "Journey", "emotion": "Joy", "words": ["tear", "smile", "memory", "goodbye"]}
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = ChallengeTracker(str(tmp_path))
+    tracker.track_challenge(CHALLENGE, target_date=DAY)
+    return tracker
+
+
+def test_increment_stats_derives_stats_on_read(tracker):
+    scores = [55, 70, 80, 61]
+    for score in scores:
+        assert tracker.increment_stats(DAY, score)
+
+    challenge = tracker.get_challenge_by_date(DAY)
+    assert challenge["submissions_count"] == len(scores)
+    assert challenge["avg_score"] == statistics.mean(scores)
+    assert challenge["best_score"] == 80
+    assert challenge["min_score"] == 55
+    assert challenge["score_stddev"] == pytest.approx(statistics.pstdev(scores))
+    assert "stats" not in challenge
+
+
+def test_legacy_day_keeps_unknown_min_and_stddev(tmp_path):
+    # Written before the accumulators existed: only the derived fields are stored
+    legacy = dict(CHALLENGE, date=DAY, submissions_count=4, avg_score=55.5, best_score=70, version=1)
+    with open(os.path.join(tmp_path, "daily_challenges.json"), "w") as f:
+        json.dump({DAY: legacy}, f)
+    tracker = ChallengeTracker(str(tmp_path))
+
+    assert tracker.increment_stats(DAY, 80)
+
+    challenge = tracker.get_challenge_by_date(DAY)
+    assert challenge["submissions_count"] == 5
+    assert challenge["avg_score"] == pytest.approx((55.5 * 4 + 80) / 5)
+    assert challenge["best_score"] == 80
+    assert challenge["min_score"] is None
+    assert challenge["score_stddev"] is None
+
+
+def test_retracking_keeps_counted_scores(tracker):
+    tracker.increment_stats(DAY, 42)
+    tracker.track_challenge(dict(CHALLENGE, theme="Home"), target_date=DAY)
+
+    challenge = tracker.get_challenge_by_date(DAY)
+    assert challenge["theme"] == "Home"
+    assert challenge["submissions_count"] == 1
+    assert challenge["min_score"] == 42
+
+
+def test_count_challenges_skips_scheduled_days(tracker):
+    tracker.track_challenge(CHALLENGE, target_date="2026-01-02")
+    tracker.track_challenge(CHALLENGE, target_date="2026-06-01")
+
+    assert tracker.count_challenges() == 3
+    assert tracker.count_challenges(until="2026-01-02") == 2
+
+
+def test_date_index_survives_stats_updates(tracker, monkeypatch):
+    tracker.track_challenge(CHALLENGE, target_date="2025-12-31")
+    assert tracker._dates() == ["2025-12-31", DAY]
+
+    rebuilds = []
+    keys = tracker._store.keys
+    monkeypatch.setattr(tracker._store, "keys", lambda: rebuilds.append(1) or keys())
+    tracker.increment_stats(DAY, 70)
+    tracker.track_challenge(CHALLENGE, target_date="2026-01-02")
+
+    assert tracker._dates() == ["2025-12-31", DAY, "2026-01-02"]
+    assert rebuilds == []
+
+
+def test_date_index_picks_up_other_writers(tracker, tmp_path):
+    assert tracker._dates() == [DAY]
+    ChallengeTracker(str(tmp_path)).track_challenge(CHALLENGE, target_date="2026-01-05")
+
+    assert tracker._dates() == [DAY, "2026-01-05"]
+
+
+def test_count_challenges_after_submit_uses_index(tracker, monkeypatch):
+    tracker.track_challenge(CHALLENGE, target_date="2026-01-02")
+    assert tracker.count_challenges(until=DAY) == 1
+
+    monkeypatch.setattr(tracker._store, "keys", lambda: pytest.fail("date index rebuilt"))
+    tracker.increment_stats(DAY, 88)
+
+    assert tracker.count_challenges(until=DAY) == 1
+    assert tracker.count_challenges() == 2
+
+
+def test_daily_payload_cache_is_thread_safe(tracker):
+    days = [f"2026-02-{day:02d}" for day in range(1, 21)]
+    for day in days:
+        tracker.track_challenge(CHALLENGE, target_date=day)
+    errors = []
+
+    def read(offset):
+        try:
+            for i in range(200):
+                day = days[(i + offset) % len(days)]
+                assert tracker.get_daily_payload(day)["challenge"]["theme"] == "Journey"
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for day in days:
+        tracker.track_challenge(CHALLENGE, target_date=day)
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(tracker._payloads) <= ChallengeTracker._PAYLOAD_CACHE_SIZE
@@ -0,0 +1,93 @@
+"""
+ETag / conditional request and JSON compression tests
+"""
+
+import gzip
+
+import pytest
+
+flask = pytest.importorskip("flask")
+
+from src.backend.utils.compression import ETAG_SUFFIX, compress, init_compression, negotiate
+from src.backend.utils.http_cache import make_etag, matching_etag
+
+VERSION = 7
+PAYLOAD = {"words": ["tear", "smile", "memory", "goodbye"] * 100}
+
+
+@pytest.fixture
+def client():
+    app = flask.Flask(__name__)
+    init_compression(app, min_size=64)
+
+    @app.route("/api/thing")
+    def thing():
+        # Same shape as main._conditional_json
+        etag = make_etag(flask.request.path, VERSION)
+        matched = matching_etag(flask.request.if_none_match, etag)
+        if matched is not None:
+            response = flask.make_response("", 304)
+            response.set_etag(matched)
+        else:
+            response = flask.jsonify(PAYLOAD)
+            response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    @app.route("/api/small")
+    def small():
+        return flask.jsonify({"ok": True})
+
+    return app.test_client()
+
+
+def test_make_etag_depends_on_every_part():
+    assert make_etag("/a", 1) == make_etag("/a", 1)
+    assert make_etag("/a", 1) != make_etag("/a", 2)
+    assert make_etag("/a", 1) != make_etag("/b", 1)
+
+
+def test_identity_response_revalidates(client):
+    first = client.get("/api/thing")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert "Content-Encoding" not in first.headers
+
+    second = client.get("/api/thing", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["ETag"] == etag
+    assert "Accept-Encoding" in second.headers["Vary"]
+
+
+def test_gzip_response_carries_suffixed_etag_through_304(client):
+    first = client.get("/api/thing", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["Content-Encoding"] == "gzip"
+    etag = first.headers["ETag"]
+    assert etag.endswith(ETAG_SUFFIX["gzip"] + '"')
+    assert flask.json.loads(gzip.decompress(first.data)) == PAYLOAD
+
+    second = client.get("/api/thing", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert second.status_code == 304
+    # The 304 repeats the validator the client holds, suffix included
+    assert second.headers["ETag"] == etag
+    assert not second.data
+
+
+def test_small_and_non_200_bodies_are_not_compressed(client):
+    response = client.get("/api/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert client.get("/missing", headers={"Accept-Encoding": "gzip"}).status_code == 404
+
+
+def test_compress_is_deterministic_and_negotiated():
+    data = b"stanzle " * 200
+    assert compress(data, "gzip") == compress(data, "gzip")
+    assert gzip.decompress(compress(data, "gzip", best=True)) == data
+    with pytest.raises(ValueError):
+        compress(data, "deflate")
+
+    with flask.Flask(__name__).test_request_context(headers={"Accept-Encoding": "gzip;q=0.5, identity"}):
+        assert negotiate(flask.request.accept_encodings, ["gzip"]) == "gzip"
+        assert negotiate(flask.request.accept_encodings, []) is None
+    with flask.Flask(__name__).test_request_context():
+        assert negotiate(flask.request.accept_encodings, ["gzip"]) is None
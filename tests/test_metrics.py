@@ -0,0 +1,73 @@
+"""
+Metrics registry tests
+"""
+
+from src.backend.services.metrics import MetricsRegistry
+from src.backend.services.storage import MemoryCollection
+
+
+def _registry(store=None):
+    # A long interval keeps increments pending until checkpoint() is called
+    return MetricsRegistry(store if store is not None else MemoryCollection(), checkpoint_interval=3600)
+
+
+def test_checkpoint_folds_pending_increments():
+    store = MemoryCollection()
+    metrics = _registry(store)
+    metrics.incr("users")
+    metrics.incr("users", 2)
+    metrics.decr("sessions")
+
+    assert metrics.get("users") == 3
+    assert store.get("counters") is None
+
+    metrics.checkpoint()
+    assert store.get("counters") == {"users": 3, "sessions": -1}
+    assert metrics.snapshot() == {"users": 3, "sessions": -1}
+
+    # A second process sees checkpointed values plus only its own pending delta
+    other = _registry(store)
+    other.incr("users")
+    assert other.get("users") == 4
+    assert metrics.get("users") == 3
+
+
+def test_seed_runs_once_per_group():
+    store = MemoryCollection()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"users": 10}
+
+    _registry(store).seed("auth", compute)
+    _registry(store).seed("auth", compute)
+    assert len(calls) == 1
+    assert _registry(store).snapshot() == {"users": 10}
+
+
+def test_reconcile_overwrites_owned_counters_and_reports_drift():
+    store = MemoryCollection()
+    store.put("counters", {"users": 7, "submissions": 3, "sessions:old": 2, "other": 5})
+    metrics = _registry(store)
+    metrics.incr("users")
+    metrics.incr("other")
+
+    owns = lambda name: name in ("users", "submissions") or name.startswith("sessions:")
+    drift = metrics.reconcile(lambda: {"users": 9, "submissions": 3}, owns)
+
+    assert drift == {"users": 8, "sessions:old": 2}
+    assert store.get("counters") == {"users": 9, "submissions": 3, "other": 6}
+    assert metrics.get("users") == 9
+    assert metrics.reconcile(lambda: {"users": 9, "submissions": 3}, owns) == {}
+
+
+def test_discard_drops_stored_and_pending():
+    store = MemoryCollection()
+    store.put("counters", {"sessions:2026-01-01": 4, "users": 1})
+    metrics = _registry(store)
+    metrics.incr("sessions:2026-01-02")
+
+    assert metrics.discard(lambda name: name.startswith("sessions:")) == 1
+    metrics.checkpoint()
+    assert store.get("counters") == {"users": 1}
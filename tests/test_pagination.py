@@ -0,0 +1,33 @@
+"""
+Pagination cursor tests
+"""
+
+import pytest
+
+from src.backend.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, clamp_page_size, decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("position", ["2026-01-01", "12345", "alice\x1f2026-01-01", "ü"])
+def test_cursor_round_trip(position):
+    cursor = encode_cursor(position)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == position
+
+
+def test_empty_cursors():
+    assert encode_cursor(None) is None
+    assert decode_cursor(None) is None
+    assert decode_cursor("") is None
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor!", "a", "__8"])
+def test_foreign_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_clamp_page_size():
+    assert clamp_page_size(None) == DEFAULT_PAGE_SIZE
+    assert clamp_page_size(0) == DEFAULT_PAGE_SIZE
+    assert clamp_page_size(5) == 5
+    assert clamp_page_size(MAX_PAGE_SIZE + 1) == MAX_PAGE_SIZE
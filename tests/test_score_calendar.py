@@ -0,0 +1,59 @@
+"""
+Score calendar tests
+"""
+
+from datetime import date
+
+from src.backend.services.score_calendar import ScoreCalendar
+
+
+def test_set_grows_in_both_directions():
+    cal = ScoreCalendar()
+    cal.set("2026-01-10", 80)
+    cal.set("2026-01-12", 90)
+    cal.set("2026-01-08", 70)
+
+    assert cal.get("2026-01-08") == 70
+    assert cal.get("2026-01-09") is None
+    assert cal.get(date(2026, 1, 12)) == 90
+    assert cal.get("2025-12-31") is None
+    assert cal.range("2026-01-07", "2026-01-13") == [None, 70, None, 80, None, 90, None]
+    assert cal.count() == 3
+    assert cal.best() == 90
+    assert cal.days() == [("2026-01-08", 70), ("2026-01-10", 80), ("2026-01-12", 90)]
+
+
+def test_scores_are_clamped_to_a_signed_byte():
+    cal = ScoreCalendar()
+    cal.set("2026-01-01", 250)
+    cal.set("2026-01-02", -5)
+    assert cal.days() == [("2026-01-01", 127), ("2026-01-02", 0)]
+
+
+def test_record_round_trip():
+    cal = ScoreCalendar()
+    cal.set("2025-12-30", 55)
+    cal.set("2026-01-02", 61)
+    restored = ScoreCalendar.from_record(cal.to_record())
+    assert restored.days() == cal.days()
+    assert ScoreCalendar.from_record({}).days() == []
+    assert ScoreCalendar().best() == 0
+
+
+def test_from_daily_scores_skips_unsubmitted_and_bad_entries():
+    cal = ScoreCalendar.from_daily_scores({
+        "2026-01-01": {"score": 40, "submitted": True},
+        "2026-01-02": {"score": 50, "submitted": False},
+        "2026-01-03": {"score": "n/a", "submitted": True},
+        "2026-01-04": "junk",
+    })
+    assert cal.days() == [("2026-01-01", 40)]
+
+
+def test_streaks():
+    cal = ScoreCalendar()
+    for day in ("2026-01-01", "2026-01-02", "2026-01-03", "2026-01-05", "2026-01-06"):
+        cal.set(day, 60)
+    assert cal.streaks() == (2, 3, "2026-01-06")
+    assert ScoreCalendar().streaks() == (0, 0, None)
+    assert len(cal.year(2026)) == 365
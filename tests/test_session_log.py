@@ -0,0 +1,87 @@
+"""
+Session log tests
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+from src.backend.services.session_log import SessionLog
+
+
+def _session(days: float = 1) -> dict:
+    return {"username": "alice", "expires_at": (datetime.now() + timedelta(days=days)).isoformat()}
+
+
+def _lines(path):
+    with open(path, "rb") as f:
+        return [json.loads(line) for line in f.read().splitlines() if line]
+
+
+def test_put_and_del_replay_in_another_reader(tmp_path):
+    path = os.path.join(tmp_path, "sessions.log")
+    writer = SessionLog(path, compact_interval=0)
+    writer.put("t1", _session())
+    writer.put("t2", _session())
+    assert writer.delete("t1")
+    assert not writer.delete("t1")
+
+    reader = SessionLog(path, compact_interval=0)
+    assert reader.get("t1") is None
+    assert reader.get("t2")["username"] == "alice"
+    assert [r["op"] for r in _lines(path)] == ["put", "put", "del"]
+
+    # Appends by the other instance are picked up by tailing
+    writer.put("t3", _session())
+    assert reader.count() == 2
+
+
+def test_legacy_sessions_json_is_imported_once(tmp_path):
+    legacy = os.path.join(tmp_path, "sessions.json")
+    with open(legacy, "w") as f:
+        json.dump({"old": _session()}, f)
+
+    log = SessionLog(os.path.join(tmp_path, "sessions.log"), legacy_json=legacy, compact_interval=0)
+    assert log.get("old") is not None
+    log.delete("old")
+
+    reopened = SessionLog(os.path.join(tmp_path, "sessions.log"), legacy_json=legacy, compact_interval=0)
+    assert reopened.get("old") is None
+
+
+def test_compaction_keeps_only_live_sessions(tmp_path):
+    path = os.path.join(tmp_path, "sessions.log")
+    log = SessionLog(path, compact_interval=0)
+    log.put("live", _session())
+    log.put("expired", _session(days=-1))
+    for i in range(100):
+        log.put(f"t{i}", _session())
+        log.delete(f"t{i}")
+
+    assert log.needs_compaction()
+    reader = SessionLog(path, compact_interval=0)
+    assert reader.count() == 2
+
+    assert log.compact() == 201
+    assert _lines(path) == [{"op": "put", "k": "live", "v": log.get("live")}]
+    # The rename gives the log a new inode; an existing reader reloads instead of tailing
+    assert reader.get("expired") is None
+    assert reader.get("live") is not None
+    assert log.compact() == 0
+
+
+def test_sweep_expired_and_save_all_diff(tmp_path):
+    path = os.path.join(tmp_path, "sessions.log")
+    log = SessionLog(path, compact_interval=0)
+    log.put("a", _session())
+    log.put("b", _session(days=-1))
+    assert log.sweep_expired() == 1
+    assert log.sweep_expired() == 0
+
+    before = len(_lines(path))
+    records = log.load_all()
+    records["c"] = _session()
+    log.save_all(records)
+    # Only the new session is appended, not the whole dict
+    assert len(_lines(path)) == before + 1
+    assert set(log.load_all()) == {"a", "c"}
@@ -0,0 +1,99 @@
+"""
+Static asset manifest and serving tests
+"""
+
+import json
+import os
+
+import pytest
+
+flask = pytest.importorskip("flask")
+
+from src.backend.utils.static_assets import BUILD_MANIFEST, StaticAssets
+
+
+def _write(public, rel_path, body="x"):
+    path = os.path.join(public, *rel_path.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(body)
+
+
+@pytest.fixture
+def public(tmp_path):
+    public = str(tmp_path)
+    _write(public, "index.html", "<html></html>")
+    for name in ("index-CscbdNN8.js", "index-BzXnVuT0.css", "app-settings.js", "vendor-abcdefgh.js"):
+        _write(public, f"assets/{name}")
+    return public
+
+
+def test_hash_pattern_without_manifest(public):
+    assets = StaticAssets(public, sendfile="")
+    assert assets.files["assets/index-CscbdNN8.js"]["immutable"]
+    assert assets.files["assets/index-BzXnVuT0.css"]["immutable"]
+    assert not assets.files["assets/app-settings.js"]["immutable"]
+    assert not assets.files["assets/vendor-abcdefgh.js"]["immutable"]
+    assert not assets.files["index.html"]["immutable"]
+
+
+def test_build_manifest_decides_immutability(public):
+    manifest = {
+        "index.html": {"file": "assets/index-CscbdNN8.js", "css": ["assets/index-BzXnVuT0.css"], "isEntry": True},
+        "src/vendor.ts": {"file": "assets/vendor-abcdefgh.js"},
+    }
+    _write(public, BUILD_MANIFEST, json.dumps(manifest))
+    assets = StaticAssets(public, sendfile="")
+    assert assets.files["assets/index-CscbdNN8.js"]["immutable"]
+    assert assets.files["assets/index-BzXnVuT0.css"]["immutable"]
+    assert assets.files["assets/vendor-abcdefgh.js"]["immutable"]
+    assert not assets.files["assets/app-settings.js"]["immutable"]
+    # The manifest itself is build metadata, not a servable file
+    assert BUILD_MANIFEST not in assets
+
+
+def _app(assets):
+    app = flask.Flask(__name__)
+
+    @app.route("/", defaults={"path": ""})
+    @app.route("/<path:path>")
+    def serve(path):
+        return assets.send(path) if path in assets else assets.send_shell()
+
+    return app.test_client()
+
+
+def test_hashed_asset_is_immutable_and_served_precompressed(public):
+    _write(public, "assets/index-CscbdNN8.js.gz", "gz")
+    client = _app(StaticAssets(public, sendfile=""))
+
+    response = client.get("/assets/index-CscbdNN8.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.data == b"gz"
+    assert response.headers["ETag"].endswith('-gz"')
+    assert "immutable" in response.headers["Cache-Control"]
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+    plain = client.get("/assets/app-settings.js")
+    assert plain.headers["Cache-Control"] == "no-cache"
+    assert client.get("/assets/app-settings.js", headers={"If-None-Match": plain.headers["ETag"]}).status_code == 304
+
+
+def test_shell_from_memory_with_encoded_etag(public):
+    _write(public, "index.html", "<html>" + "stanzle " * 200 + "</html>")
+    client = _app(StaticAssets(public, sendfile=""))
+
+    first = client.get("/profile", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["Content-Encoding"] == "gzip"
+    etag = first.headers["ETag"]
+    again = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_sendfile_hands_off_to_proxy(public):
+    client = _app(StaticAssets(public, sendfile="x-accel", accel_prefix="/_public/"))
+    response = client.get("/assets/index-CscbdNN8.js")
+    assert response.headers["X-Accel-Redirect"] == "/_public/assets/index-CscbdNN8.js"
+    assert not response.data
@@ -0,0 +1,65 @@
+"""
+Streak leaderboard tests
+"""
+
+import pytest
+
+pytest.importorskip("bcrypt")
+
+from src.backend.services.auth_service import AuthService
+
+
+@pytest.fixture
+def auth(tmp_path, monkeypatch):
+    monkeypatch.setenv("STREAK_BOARD_SIZE", "3")
+    monkeypatch.setenv("BCRYPT_ROUNDS", "4")
+    return AuthService(str(tmp_path))
+
+
+def _play(auth, username, days):
+    if auth._get_user(username) is None:
+        assert auth.register_user(username, f"{username}@example.com", "Passw0rd!!")["success"]
+    for day in days:
+        assert auth.submit_daily_score(username, 70, calendar_date=day)["success"]
+
+
+def _names(board):
+    return [(s["username"], s["streak"]) for s in board["streaks"]]
+
+
+def test_current_board_merges_today_and_yesterday(auth):
+    _play(auth, "alice", ["2026-03-01", "2026-03-02", "2026-03-03"])
+    _play(auth, "bobby", ["2026-03-02", "2026-03-03", "2026-03-04"])
+    _play(auth, "carol", ["2026-03-01"])
+
+    board = auth.get_streak_leaderboard(kind="current", today="2026-03-04")
+    # alice's streak is still live on the day after her last submission; carol's has lapsed
+    assert _names(board) == [("alice", 3), ("bobby", 3)]
+    assert _names(auth.get_streak_leaderboard(kind="current", today="2026-03-05")) == [("bobby", 3)]
+
+
+def test_newest_entry_wins_across_days(auth):
+    _play(auth, "alice", ["2026-03-01", "2026-03-02"])
+    _play(auth, "alice", ["2026-03-03"])
+    assert _names(auth.get_streak_leaderboard(kind="current", today="2026-03-03")) == [("alice", 3)]
+
+
+def test_boards_are_capped_and_old_days_pruned(auth):
+    for i, name in enumerate(["alice", "bobby", "carol", "dave1", "erin1"]):
+        _play(auth, name, [f"2026-03-{d:02d}" for d in range(1, i + 2)])
+
+    board = auth._leaderboards_store.get("streaks")
+    assert [e[-1] for e in board["longest"]] == ["erin1", "dave1", "carol"]
+    assert _names(auth.get_streak_leaderboard(kind="longest")) == [("erin1", 5), ("dave1", 4), ("carol", 3)]
+    day_keys = [k for k in auth._leaderboards_store.keys() if k.startswith("streaks:")]
+    assert day_keys == sorted(day_keys) and day_keys[0] >= "streaks:2026-03-03"
+
+
+def test_rebuild_matches_incremental_boards(auth):
+    _play(auth, "alice", ["2026-03-01", "2026-03-02"])
+    _play(auth, "bobby", ["2026-03-02"])
+    before = auth.get_streak_leaderboard(kind="current", today="2026-03-02")
+
+    assert auth.rebuild_streaks() == 2
+    assert auth.get_streak_leaderboard(kind="current", today="2026-03-02")["streaks"] == before["streaks"]
+    assert _names(auth.get_streak_leaderboard(kind="longest")) == [("alice", 2), ("bobby", 1)]
@@ -18,6 +18,10 @@ export default defineConfig({
     react(),
     tailwindcss(),
   ],
+  build: {
+    // dist/.vite/manifest.json: the Flask static server marks exactly these outputs immutable
+    manifest: true,
+  },
   resolve: {
     alias: {
       // Alias @ to the src directory